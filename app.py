@@ -15,6 +15,8 @@ import base64
 import traceback
 
 AI_ASSESSMENT_FEATURE_FLAG = False  # AI-Powered Assessment機能のON/OFF切り替え
+AI_MAX_CONCURRENCY = 5  # AI評価で同時に実行するリクエスト数
+HTML_PARSER = "html.parser"  # ページ内容抽出のHTMLパーサー (html.parser / lxml / html5lib / selectolax)
 
 WCAG_LEVEL_TAGS = {
     "A": "wcag2a",
@@ -123,9 +125,9 @@ def main():
             status_text.text("Initializing accessibility checker...")
             progress_bar.progress(10)
             
-            checker = AccessibilityChecker()
+            checker = AccessibilityChecker(parser=HTML_PARSER)
             if AI_ASSESSMENT_FEATURE_FLAG and ai_provider:
-                ai_evaluator = AIEvaluator(provider=ai_provider.split()[0].lower())
+                ai_evaluator = AIEvaluator(provider=ai_provider.split()[0].lower(), max_concurrency=AI_MAX_CONCURRENCY)
             else:
                 ai_evaluator = None
             report_generator = ReportGenerator()
@@ -139,23 +141,32 @@ def main():
                 'wcag_version': wcag_version
             }
             
+            run_manual = include_manual and AI_ASSESSMENT_FEATURE_FLAG and ai_evaluator
+            
             # Automated testing with axe-core
+            page_content = None
             if include_automated:
                 status_text.text("Running automated accessibility tests...")
                 progress_bar.progress(30)
                 
-                automated_results = checker.run_axe_core_analysis(url, wcag_levels=wcag_levels)
+                # One browser visit serves both axe and the AI page content
+                analysis = checker.analyze(url, wcag_levels=wcag_levels, include_content=bool(run_manual))
+                automated_results = analysis['automated_results']
+                page_content = analysis['page_content']
                 
                 results['automated_results'] = automated_results
                 
                 st.success(f"Automated testing completed: {len(automated_results.get('violations', []))} violations found")
             
             # Manual assessment with AI
-            if include_manual and AI_ASSESSMENT_FEATURE_FLAG and ai_evaluator:
+            if run_manual:
                 status_text.text("Running AI-powered manual assessment...")
                 progress_bar.progress(60)
-                page_content = checker.get_page_content(url)
-                manual_results = ai_evaluator.evaluate_manual_criteria(page_content, wcag_levels, wcag_version)
+                if page_content is None:
+                    page_content = checker.get_page_content(url)
+                manual_results = ai_evaluator.evaluate_manual_criteria(
+                    page_content, wcag_levels, wcag_version, automated_results=results['automated_results']
+                )
                 results['manual_results'] = manual_results
                 st.success(f"AI-powered assessment completed for {len(manual_results)} criteria")
             else:
@@ -259,7 +270,7 @@ def display_results(results, report, report_generator):
             compliance_data.append({
                 'Criteria': criteria_id,
                 'Level': criteria_data.get('level', 'Unknown'),
-                'Status': criteria_data.get('status', 'unknown').title(),
+                'Status': criteria_data.get('status', 'unknown').replace('_', ' ').title(),
                 'Priority': criteria_data.get('priority', 'medium')
             })
         
@@ -270,7 +281,8 @@ def display_results(results, report, report_generator):
             status_counts = df['Status'].value_counts()
             fig = px.pie(values=status_counts.values, names=status_counts.index,
                         title="WCAG Criteria Status Distribution",
-                        color_discrete_map={'Pass': '#28a745', 'Fail': '#dc3545', 'Warning': '#ffc107'})
+                        color_discrete_map={'Pass': '#28a745', 'Fail': '#dc3545', 'Warning': '#ffc107',
+                                            'Not Applicable': '#6c757d'})
             st.plotly_chart(fig, use_container_width=True)
     
     # Detailed results tabs
@@ -373,13 +385,13 @@ def display_manual_results(manual_results):
             
             for criteria_id, criteria_data in level_criteria.items():
                 status = criteria_data.get('status', 'unknown')
-                status_icon = {"pass": "✅", "fail": "❌", "warning": "⚠️"}.get(status, "❓")
+                status_icon = {"pass": "✅", "fail": "❌", "warning": "⚠️", "not_applicable": "➖"}.get(status, "❓")
                 
                 with st.expander(f"{status_icon} {criteria_id}: {criteria_data.get('title', 'Unknown criteria')}"):
                     col1, col2 = st.columns([2, 1])
                     
                     with col1:
-                        st.markdown(f"**Status:** {status.title()}")
+                        st.markdown(f"**Status:** {status.replace('_', ' ').title()}")
                         st.markdown(f"**Assessment:** {criteria_data.get('assessment', 'No assessment available')}")
                         
                         if criteria_data.get('issues'):
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Compare the HTML parser backends of page content extraction on the fixture corpus
+
+Usage:
+    python -m benchmarks.compare_parsers --output parsers.json
+    python -m benchmarks.compare_parsers --pages small,medium --parsers html.parser,selectolax
+
+Every backend is timed on the same pages, and its page_content is checked
+against html.parser's: any field that differs is reported under 'mismatches'.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+from benchmarks.fixtures import FIXTURE_SIZES, generate_corpus
+from benchmarks.run_benchmarks import current_commit
+from src.page_extractor import DEFAULT_PARSER, available_parsers, extract_page_content
+
+
+def benchmark_parser(parser: str, url: str, html: str, repeat: int) -> Dict[str, Any]:
+    """Median and min extraction time of one backend on one page, plus its last page_content"""
+    timings = []
+    page_content = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        page_content = extract_page_content(url, html, parser)
+        timings.append(time.perf_counter() - start)
+    return {
+        'median': statistics.median(timings),
+        'min': min(timings),
+        'runs': len(timings),
+        'page_content': page_content
+    }
+
+
+def mismatched_fields(expected: Dict[str, Any], actual: Dict[str, Any]) -> List[str]:
+    return sorted(key for key in set(expected) | set(actual) if expected.get(key) != actual.get(key))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare HTML parser backends for page content extraction")
+    parser.add_argument('--pages', default='small,medium,large', help="Comma-separated fixture names")
+    parser.add_argument('--parsers', default=','.join(available_parsers()), help="Comma-separated parser backends")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per page and parser")
+    parser.add_argument('--output', default='-', help="JSON output file ('-' for stdout)")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.pages.split(',') if name.strip()]
+    unknown = [name for name in names if name not in FIXTURE_SIZES]
+    if unknown:
+        parser.error(f"Unknown fixture pages: {', '.join(unknown)}")
+    parsers = [name.strip() for name in args.parsers.split(',') if name.strip()]
+    unavailable = [name for name in parsers if name not in available_parsers()]
+    if unavailable:
+        parser.error(f"Unavailable parsers: {', '.join(unavailable)} (installed: {', '.join(available_parsers())}; "
+                     f"install the 'parsers' extra for lxml, html5lib and selectolax)")
+    if DEFAULT_PARSER not in parsers:
+        parsers.insert(0, DEFAULT_PARSER)
+
+    corpus = generate_corpus({name: FIXTURE_SIZES[name] for name in names})
+    report = {
+        'meta': {
+            'commit': current_commit(),
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'reference_parser': DEFAULT_PARSER
+        },
+        'pages': {}
+    }
+
+    for name in names:
+        path = f'/{name}.html'
+        html = corpus[path]
+        results = {backend: benchmark_parser(backend, path, html, args.repeat) for backend in parsers}
+        reference = results[DEFAULT_PARSER]['page_content']
+        report['pages'][name] = {
+            'target_nodes': FIXTURE_SIZES[name],
+            'html_bytes': len(html.encode('utf-8')),
+            'parsers': {
+                backend: {
+                    'median': result['median'],
+                    'min': result['min'],
+                    'runs': result['runs'],
+                    'speedup': results[DEFAULT_PARSER]['median'] / result['median'],
+                    'mismatches': mismatched_fields(reference, result['page_content'])
+                }
+                for backend, result in results.items()
+            }
+        }
+        for backend, result in report['pages'][name]['parsers'].items():
+            status = 'identical' if not result['mismatches'] else f"differs in {', '.join(result['mismatches'])}"
+            print(f"{name} {backend}: {result['median']:.3f}s ({result['speedup']:.1f}x), {status}", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output == '-':
+        print(output)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
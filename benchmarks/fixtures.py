@@ -0,0 +1,153 @@
+"""
+Synthetic HTML pages and a local HTTP server for benchmarks
+
+Pages are generated deterministically so timings can be compared across
+commits. Every page mixes headings, text, lists, tables, links, images (some
+without alt text), forms (some inputs without labels), iframes and shadow DOM.
+"""
+
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+# Page name -> approximate number of elements
+FIXTURE_SIZES = {
+    'small': 200,
+    'medium': 5000,
+    'large': 25000,
+    'huge': 100000
+}
+
+# Elements produced by one call of _section (used to scale pages to a node count)
+NODES_PER_SECTION = 40
+
+SHADOW_DOM_SCRIPT = """
+<script>
+document.querySelectorAll('.shadow-host-scripted').forEach(function (host) {
+    var root = host.attachShadow({mode: 'open'});
+    root.innerHTML = '<button>Action</button><img src="/static/icon.png"><span>Shadow text</span>';
+});
+</script>
+"""
+
+
+def _section(index: int, rng: random.Random) -> str:
+    """One block of representative content"""
+    has_alt = rng.random() > 0.2
+    has_label = rng.random() > 0.25
+    alt = f' alt="Illustration {index}"' if has_alt else ''
+    label = f'<label for="field-{index}">Field {index}</label>' if has_label else ''
+    heading_level = 2 + index % 4
+    return f"""
+<section id="section-{index}">
+  <h{heading_level}>Section {index}</h{heading_level}>
+  <p>Paragraph {index} with <a href="/page/{index}">a link</a> and <strong>emphasis</strong>.
+     Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor.</p>
+  <img src="/static/image-{index}.png"{alt} width="120" height="80">
+  <ul>
+    <li><a href="/item/{index}/1">Item one</a></li>
+    <li><a href="/item/{index}/2">Item two</a></li>
+    <li><a href="/item/{index}/3"><img src="/static/arrow.png"></a></li>
+  </ul>
+  <table>
+    <tr><th>Name</th><th>Value</th></tr>
+    <tr><td>Alpha</td><td>{index}</td></tr>
+    <tr><td>Beta</td><td>{index * 2}</td></tr>
+  </table>
+  <form action="/submit/{index}" method="post">
+    {label}
+    <input type="text" id="field-{index}" name="field-{index}">
+    <label><input type="checkbox" name="agree-{index}"> I agree</label>
+    <select id="choice-{index}" name="choice-{index}"><option>One</option><option>Two</option></select>
+    <textarea id="notes-{index}" name="notes-{index}" aria-label="Notes"></textarea>
+    <button type="submit">Send</button>
+  </form>
+  <div class="shadow-host">
+    <template shadowrootmode="open"><p>Declarative shadow content {index}</p><a href="#">More</a></template>
+  </div>
+  <div class="shadow-host-scripted"></div>
+  <div style="color: #999; background: #fff">Low contrast text {index}</div>
+</section>"""
+
+
+def generate_page(name: str, node_count: int, seed: int = 0) -> str:
+    """Build a synthetic page with roughly node_count elements"""
+    rng = random.Random(f"{seed}:{name}")
+    sections = max(1, node_count // NODES_PER_SECTION)
+    iframes = min(5, 1 + sections // 50)
+    body = ''.join(_section(i, rng) for i in range(sections))
+    frames = ''.join(
+        f'<iframe title="Embedded {i}" srcdoc="&lt;h1&gt;Frame {i}&lt;/h1&gt;&lt;img src=&quot;x.png&quot;&gt;"></iframe>'
+        for i in range(iframes)
+    )
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1">
+  <meta name="description" content="Synthetic {name} benchmark page">
+  <title>Benchmark page: {name}</title>
+</head>
+<body>
+  <header><nav><a href="/">Home</a> <a href="/about">About</a></nav></header>
+  <main>
+    <h1>Benchmark page: {name}</h1>
+    {body}
+    {frames}
+  </main>
+  <footer><p>Footer</p></footer>
+  {SHADOW_DOM_SCRIPT}
+</body>
+</html>
+"""
+
+
+def generate_corpus(sizes: Dict[str, int] = None) -> Dict[str, str]:
+    """Generate all benchmark pages keyed by URL path"""
+    sizes = sizes or FIXTURE_SIZES
+    return {f'/{name}.html': generate_page(name, count) for name, count in sizes.items()}
+
+
+class FixtureServer:
+    """
+    Serves a page corpus from memory on a local port in a background thread
+    """
+
+    def __init__(self, pages: Dict[str, str]):
+        self.pages = {path: html.encode('utf-8') for path, html in pages.items()}
+        pages_bytes = self.pages
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = pages_bytes.get(self.path.split('?')[0])
+                if body is None:
+                    # Images and other subresources: empty but successful
+                    self.send_response(200 if self.path.startswith('/static/') else 404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Stage-by-stage benchmark of the accessibility pipeline against local fixtures
+
+Usage:
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --pages small,medium --no-browser
+
+No network access is needed: pages are served from a local HTTP server.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from benchmarks.fixtures import FIXTURE_SIZES, FixtureServer, generate_corpus
+from src.accessibility_checker import (
+    AXE_RESULT_SCRIPT, TRIM_AXE_RESULTS_FUNCTION, AccessibilityChecker
+)
+from src.driver_pool import create_chrome_driver, tab_state
+from src.report_generator import ReportGenerator
+
+# Seconds allowed for axe.run; Selenium's 30 second default is too short for the 'huge' fixture
+DEFAULT_SCRIPT_TIMEOUT = 300.0
+
+STAGES = [
+    'driver_startup',
+    'axe_injection',
+    'navigation',
+    'axe_run',
+    'result_transfer',
+    'process_axe_results',
+    'get_page_content',
+    'generate_report'
+]
+
+# Runs axe and leaves the (trimmed) results in the page so the transfer can be timed separately
+TIMED_AXE_RUN_SCRIPT = """
+const callback = arguments[arguments.length - 1];
+const trim = %s;
+const limits = arguments[1];
+const start = performance.now();
+window.__a11yScanResult = null;
+axe.run(document, arguments[0])
+    .then(results => {
+        window.__a11yScanResult = trim(results, limits);
+        callback(performance.now() - start);
+    })
+    .catch(err => callback({error: err.toString()}));
+""" % TRIM_AXE_RESULTS_FUNCTION
+
+
+class StageTimer:
+    """Collects wall-clock durations per stage; a stage entered twice adds up"""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+
+def benchmark_page(url: str, use_browser: bool = True, wcag_levels: List[str] = None,
+                   script_timeout: float = DEFAULT_SCRIPT_TIMEOUT) -> Dict[str, Any]:
+    """
+    Run the full pipeline once against a URL and time every stage
+
+    axe is loaded the way AccessibilityChecker loads it: registered with DevTools
+    before navigation, with direct injection only as the fallback. 'axe_injection'
+    covers both, and extra['axe_registered'] tells which path was taken.
+    """
+    wcag_levels = wcag_levels or ['A', 'AA']
+    timer = StageTimer()
+    checker = AccessibilityChecker()
+    automated_results = None
+    extra = {}
+
+    if use_browser:
+        with timer.stage('driver_startup'):
+            checker.driver = create_chrome_driver(checker.load_profile)
+        try:
+            checker.driver.set_script_timeout(script_timeout)
+
+            with timer.stage('axe_injection'):
+                checker._prepare_tab()
+            state = tab_state(checker.driver, checker.driver.current_window_handle)
+            extra['axe_registered'] = bool(state.get('axe_registered'))
+
+            with timer.stage('navigation'):
+                checker.driver.get(url)
+                WebDriverWait(checker.driver, 60).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+
+            with timer.stage('axe_injection'):
+                checker._inject_axe_core()
+
+            with timer.stage('axe_run'):
+                axe_ms = checker.driver.execute_async_script(
+                    TIMED_AXE_RUN_SCRIPT, checker._build_axe_options(wcag_levels), checker._result_limits()
+                )
+            if isinstance(axe_ms, dict):
+                raise Exception(f"axe-core error: {axe_ms['error']}")
+            extra['axe_run_in_page'] = axe_ms / 1000.0
+
+            with timer.stage('result_transfer'):
+                raw_results = checker.driver.execute_script(AXE_RESULT_SCRIPT)
+            extra['result_bytes'] = len(json.dumps(raw_results))
+
+            with timer.stage('process_axe_results'):
+                automated_results = checker._process_axe_results(raw_results)
+        finally:
+            checker._teardown_driver()
+
+    with timer.stage('get_page_content'):
+        page_content = checker.get_page_content(url)
+
+    with timer.stage('generate_report'):
+        ReportGenerator().generate_report({
+            'url': url,
+            'timestamp': datetime.now().isoformat(),
+            # ReportGenerator expects a dict here even when axe was skipped
+            'automated_results': automated_results or {},
+            'manual_results': None,
+            'wcag_levels': wcag_levels,
+            'wcag_version': '2.1'
+        })
+
+    extra['html_structure_chars'] = len(page_content.get('html_structure', ''))
+    return {'stages': timer.timings, 'extra': extra}
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Median and min of every stage over repeated runs"""
+    summary = {}
+    for stage in STAGES + ['total']:
+        values = [run['stages'][stage] for run in runs if stage in run['stages']]
+        if values:
+            summary[stage] = {'median': statistics.median(values), 'min': min(values), 'runs': len(values)}
+    return summary
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return 'unknown'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the accessibility pipeline on local fixture pages")
+    parser.add_argument('--pages', default=','.join(FIXTURE_SIZES), help="Comma-separated fixture names")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per page")
+    parser.add_argument('--no-browser', action='store_true', help="Skip the Chrome/axe stages")
+    parser.add_argument('--script-timeout', type=float, default=DEFAULT_SCRIPT_TIMEOUT,
+                        help="Seconds allowed for axe.run per page")
+    parser.add_argument('--output', default='-', help="JSON output file ('-' for stdout)")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.pages.split(',') if name.strip()]
+    unknown = [name for name in names if name not in FIXTURE_SIZES]
+    if unknown:
+        parser.error(f"Unknown fixture pages: {', '.join(unknown)}")
+
+    corpus = generate_corpus({name: FIXTURE_SIZES[name] for name in names})
+    report = {
+        'meta': {
+            'commit': current_commit(),
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'browser': not args.no_browser,
+            'script_timeout': args.script_timeout
+        },
+        'pages': {}
+    }
+
+    with FixtureServer(corpus) as server:
+        for name in names:
+            runs = []
+            errors = []
+            for _ in range(args.repeat):
+                # A page that fails (e.g. axe.run exceeding the script timeout) must not lose the other results
+                try:
+                    run = benchmark_page(f'{server.base_url}/{name}.html', use_browser=not args.no_browser,
+                                         script_timeout=args.script_timeout)
+                except Exception as e:
+                    errors.append(f"{type(e).__name__}: {str(e).strip()}")
+                    print(f"{name}: failed: {errors[-1]}", file=sys.stderr)
+                    continue
+                run['stages']['total'] = sum(run['stages'].values())
+                runs.append(run)
+                print(f"{name}: {run['stages']['total']:.3f}s", file=sys.stderr)
+            report['pages'][name] = {
+                'target_nodes': FIXTURE_SIZES[name],
+                'html_bytes': len(corpus[f'/{name}.html'].encode('utf-8')),
+                'stages': summarize(runs),
+                'extra': runs[-1]['extra'] if runs else {},
+                'errors': errors
+            }
+
+    output = json.dumps(report, indent=2)
+    if args.output == '-':
+        print(output)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
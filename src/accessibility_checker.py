@@ -1,14 +1,16 @@
-import json
 import time
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
-import requests
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterator, Optional, Tuple
 import os
+from collections import deque
+from functools import lru_cache
+from src.driver_pool import DriverPool, create_chrome_driver, is_browser_failure, tab_state
+from src.load_profile import DEFAULT_LOAD_PROFILE, NETWORK_IDLE_SCRIPT, NETWORK_TRACKER_SCRIPT, LoadProfile
+from src.http_client import DEFAULT_MAX_PAGE_BYTES, HTTPClient, PageStream, get_http_client
+from src.page_extractor import DEFAULT_PARSER, check_parser, extract_page_content, extract_page_content_from_chunks
 
 WCAG_LEVEL_TAGS = {
     "A": "wcag2a",
@@ -16,101 +18,143 @@ WCAG_LEVEL_TAGS = {
     "AAA": "wcag2aaa"
 }
 
-class AccessibilityChecker:
+AXE_SCRIPT_PATH = os.path.join(os.path.dirname(__file__), "axe.min.js")
+
+# Sorted tag tuple -> ids of the axe rules those tags select (fixed for a given axe.min.js)
+_axe_rule_ids_cache = {}
+
+
+@lru_cache(maxsize=1)
+def load_axe_script() -> str:
+    """Read axe.min.js once per process and keep it in memory"""
+    with open(AXE_SCRIPT_PATH, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+# Multi-tab scanning: navigation is started from JavaScript so it doesn't block,
+# and the old document is marked so its replacement can be recognised
+# Marks the document a tab is leaving, so NAVIGATION_STATE_SCRIPT can tell it from the new one
+MARK_NAVIGATION_PENDING_SCRIPT = "document.documentElement.setAttribute('data-a11y-scan-pending', '1');"
+
+CLEAR_NAVIGATION_PENDING_SCRIPT = "document.documentElement.removeAttribute('data-a11y-scan-pending');"
+
+NAVIGATION_STATE_SCRIPT = """
+if (document.documentElement && document.documentElement.hasAttribute('data-a11y-scan-pending')) {
+    return 'pending';
+}
+if (window.location.protocol === 'chrome-error:') {
+    return 'failed';
+}
+return document.readyState;
+"""
+
+# Reduces axe results in the page to the fields _process_axe_results keeps, so the
+# per-node check details never cross the WebDriver wire. limits.maxNodes caps nodes
+# per rule and limits.maxHtml shortens html snippets (null disables either).
+TRIM_AXE_RESULTS_FUNCTION = """
+function (results, limits) {
+    const shorten = html => (limits.maxHtml !== null && html && html.length > limits.maxHtml)
+        ? html.slice(0, limits.maxHtml) + '...' : html;
+    const trimmed = {};
+    for (const category of ['violations', 'passes', 'incomplete', 'inapplicable']) {
+        trimmed[category] = (results[category] || []).map(item => {
+            let nodes = item.nodes || [];
+            if (limits.maxNodes !== null) nodes = nodes.slice(0, limits.maxNodes);
+            return {
+                id: item.id,
+                description: item.description,
+                help: item.help,
+                helpUrl: item.helpUrl,
+                impact: item.impact,
+                tags: item.tags,
+                nodes: nodes.map(node => ({
+                    target: node.target,
+                    html: shorten(node.html),
+                    failureSummary: node.failureSummary,
+                    impact: node.impact
+                }))
+            };
+        });
+    }
+    return trimmed;
+}
+"""
+
+RUN_AXE_SCRIPT = """
+const callback = arguments[arguments.length - 1];
+const trim = %s;
+const limits = arguments[1];
+axe.run(document, arguments[0])
+    .then(results => callback(trim(results, limits)))
+    .catch(err => callback({error: err.toString()}));
+""" % TRIM_AXE_RESULTS_FUNCTION
+
+# axe.run is started without waiting so several tabs can evaluate at once
+START_AXE_SCRIPT = """
+const trim = %s;
+const limits = arguments[1];
+window.__a11yScanResult = null;
+axe.run(document, arguments[0])
+    .then(results => { window.__a11yScanResult = trim(results, limits); })
+    .catch(err => { window.__a11yScanResult = {error: err.toString()}; });
+""" % TRIM_AXE_RESULTS_FUNCTION
+
+AXE_RESULT_SCRIPT = "return window.__a11yScanResult;"
+
+# Rule ids runOnly {type: 'tag'} would select; experimental rules only run when asked for
+AXE_RULE_IDS_SCRIPT = """
+const tags = arguments[0];
+const includeExperimental = tags.includes('experimental');
+return axe.getRules(tags)
+    .filter(rule => includeExperimental || !rule.tags.includes('experimental'))
+    .map(rule => rule.ruleId);
+"""
+
+TAB_POLL_INTERVAL = 0.1
+
+
+class AxeScanner:
     """
-    Handles automated accessibility testing using axe-core and Selenium
+    axe options and result handling shared by AccessibilityChecker (Selenium)
+    and AsyncAccessibilityChecker (DevTools), so both return the same results
     """
     
-    def __init__(self):
-        self.driver = None
-    
-    def _setup_driver(self):
-        """Initialize Chrome WebDriver with appropriate options"""
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
-        
-        try:
-            self.driver = webdriver.Chrome(options=chrome_options)
-            return True
-        except Exception as e:
-            print(f"Failed to initialize Chrome driver: {e}")
-            return False
-    
-    def _inject_axe_core(self):
-        """Inject axe-core JavaScript library into the page"""
-        # axe.min.jsをローカルから読み込む
-        with open(os.path.join(os.path.dirname(__file__), "axe.min.js"), "r", encoding="utf-8") as f:
-            axe_script = f.read()
-        self.driver.execute_script(axe_script)
-        # axe-coreがロードされるまで待機
-        WebDriverWait(self.driver, 10).until(
-            lambda driver: driver.execute_script("return typeof axe !== 'undefined';")
-        )
-        # axe-coreが本当にロードされたか確認
-        axe_type = self.driver.execute_script("return typeof axe;")
-        print(f"axe type: {axe_type}")  # 'object' であればOK、'undefined'ならNG
-    
-    def run_axe_core_analysis(self, url: str, wcag_levels: list = None) -> Dict[str, Any]:
+    def __init__(self, load_profile: Optional[LoadProfile] = None, result_types: Optional[List[str]] = None,
+                 max_nodes_per_rule: Optional[int] = None, max_html_length: Optional[int] = None):
         """
-        Run axe-core accessibility analysis on the given URL
-        
         Args:
-            url: The URL to analyze
-            wcag_levels: List of WCAG levels to analyze
-            
-        Returns:
-            Dictionary containing axe-core results
+            load_profile: How pages are loaded before axe runs (full load by default)
+            result_types: axe resultTypes, e.g. ['violations', 'incomplete']; other
+                categories then carry at most one node per rule
+            max_nodes_per_rule: Keep at most this many nodes per rule
+            max_html_length: Truncate node html snippets to this many characters
         """
-        if not self._setup_driver():
-            raise Exception("Failed to setup WebDriver")
+        self.load_profile = load_profile or DEFAULT_LOAD_PROFILE
+        self.result_types = result_types
+        self.max_nodes_per_rule = max_nodes_per_rule
+        self.max_html_length = max_html_length
+    
+    def _build_axe_options(self, wcag_levels: list = None) -> Dict[str, Any]:
+        """Build the axe.run options for the requested WCAG levels"""
+        # WCAGレベルをタグに変換
+        if wcag_levels:
+            tags = [WCAG_LEVEL_TAGS[level] for level in wcag_levels if level in WCAG_LEVEL_TAGS]
+        else:
+            tags = ["wcag2a", "wcag2aa"]  # デフォルト
         
-        try:
-            # Navigate to the URL
-            self.driver.get(url)
-            
-            # Wait for page to load
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            
-            # Inject axe-core
-            self._inject_axe_core()
-            
-            # WCAGレベルをタグに変換
-            if wcag_levels:
-                tags = [WCAG_LEVEL_TAGS[level] for level in wcag_levels if level in WCAG_LEVEL_TAGS]
-            else:
-                tags = ["wcag2a", "wcag2aa"]  # デフォルト
-            
-            axe_options = {
-                "runOnly": {
-                    "type": "tag",
-                    "values": tags
-                }
+        axe_options = {
+            "runOnly": {
+                "type": "tag",
+                "values": tags
             }
-            
-            # Run axe-core analysis with options
-            axe_results = self.driver.execute_async_script("""
-                const callback = arguments[arguments.length - 1];
-                axe.run(document, %s).then(results => callback(results)).catch(err => callback({error: err.toString()}));
-            """ % json.dumps(axe_options))
-            
-            # Process and clean results
-            if axe_results is None:
-                raise Exception("axe.run did not return any results (None). JavaScript execution may have failed.")
-            return self._process_axe_results(axe_results)
-            
-        except Exception as e:
-            raise Exception(f"Error during axe-core analysis: {str(e)}")
-        
-        finally:
-            if self.driver:
-                self.driver.quit()
+        }
+        if self.result_types:
+            axe_options["resultTypes"] = self.result_types
+        return axe_options
+    
+    def _result_limits(self) -> Dict[str, Optional[int]]:
+        """Limits passed to TRIM_AXE_RESULTS_FUNCTION"""
+        return {'maxNodes': self.max_nodes_per_rule, 'maxHtml': self.max_html_length}
     
     def _process_axe_results(self, results: Dict[str, Any]) -> Dict[str, Any]:
         """Process and clean axe-core results"""
@@ -150,123 +194,502 @@ class AccessibilityChecker:
                     processed[category].append(processed_item)
         
         return processed
+
+
+class AccessibilityChecker(AxeScanner):
+    """
+    Handles automated accessibility testing using axe-core and Selenium
+    """
     
-    def get_page_content(self, url: str) -> Dict[str, Any]:
+    def __init__(self, driver_pool: Optional[DriverPool] = None, load_profile: Optional[LoadProfile] = None,
+                 result_types: Optional[List[str]] = None, max_nodes_per_rule: Optional[int] = None,
+                 max_html_length: Optional[int] = None, parser: str = DEFAULT_PARSER,
+                 max_page_bytes: Optional[int] = DEFAULT_MAX_PAGE_BYTES, http_client: Optional[HTTPClient] = None):
         """
-        Extract page content for AI analysis
+        Args:
+            driver_pool: Optional pool of warm drivers to borrow from instead of
+                launching (and quitting) a new Chrome for every scan
+            load_profile: How pages are loaded before axe runs (full load by default).
+                A pool's drivers use the pageLoadStrategy the pool was created with.
+            result_types: axe resultTypes, e.g. ['violations', 'incomplete']; other
+                categories then carry at most one node per rule
+            max_nodes_per_rule: Keep at most this many nodes per rule
+            max_html_length: Truncate node html snippets to this many characters
+            parser: HTML parser backend for page content extraction, one of
+                available_parsers() (html.parser, plus lxml, html5lib and selectolax
+                with the 'parsers' extra)
+            max_page_bytes: Read at most this many bytes of a page in get_page_content;
+                larger pages are analyzed from their beginning (None for no limit)
+            http_client: Client for page downloads (pooling, compression, retries,
+                HTTP/2); the process-wide shared client by default
+        """
+        check_parser(parser)
+        super().__init__(load_profile, result_types, max_nodes_per_rule, max_html_length)
+        self.driver = None
+        self.driver_pool = driver_pool
+        self.parser = parser
+        self.max_page_bytes = max_page_bytes
+        self.http_client = http_client or get_http_client()
+    
+    def _setup_driver(self):
+        """Initialize Chrome WebDriver, borrowing from the pool when one is configured"""
+        try:
+            if self.driver_pool is not None:
+                self.driver = self.driver_pool.acquire()
+            else:
+                self.driver = create_chrome_driver(self.load_profile)
+            return True
+        except Exception as e:
+            print(f"Failed to initialize Chrome driver: {e}")
+            return False
+    
+    def _teardown_driver(self, discard: bool = False):
+        """Return the driver to the pool, or quit it when running without one"""
+        if not self.driver:
+            return
+        try:
+            if self.driver_pool is not None:
+                self.driver_pool.release(self.driver, discard=discard)
+            else:
+                self.driver.quit()
+        finally:
+            self.driver = None
+    
+    def _prepare_tab(self):
+        """Set up the current tab for scanning: axe registration and load profile"""
+        self._register_axe_core()
+        self._apply_load_profile()
+    
+    def _register_axe_core(self):
+        """
+        Have Chrome evaluate axe-core on every new document of the current tab
+
+        Uses the DevTools Page.addScriptToEvaluateOnNewDocument command, so the
+        ~550 KB script crosses the WebDriver wire once per tab instead of once
+        per page. Pooled drivers keep the registration across scans.
+        """
+        state = tab_state(self.driver, self.driver.current_window_handle)
+        if state.get('axe_registered'):
+            return
+        try:
+            self.driver.execute_cdp_cmd('Page.enable', {})
+            self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': load_axe_script()})
+            state['axe_registered'] = True
+        except Exception as e:
+            # Not a Chromium driver or DevTools unavailable; _inject_axe_core falls back
+            print(f"Could not register axe-core with DevTools: {e}")
+    
+    def _apply_load_profile(self):
+        """Apply this checker's request blocking and network tracking to the current tab"""
+        state = tab_state(self.driver, self.driver.current_window_handle)
+        applied_urls = state.get('blocked_urls', [])
+        tracker_id = state.get('tracker_id')
+        blocked_urls = self.load_profile.blocked_urls()
+        wants_tracker = bool(self.load_profile.network_idle_ms)
+        if applied_urls == blocked_urls and bool(tracker_id) == wants_tracker:
+            return
+        
+        try:
+            if applied_urls != blocked_urls:
+                self.driver.execute_cdp_cmd('Network.enable', {})
+                self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked_urls})
+            
+            if wants_tracker and not tracker_id:
+                self.driver.execute_cdp_cmd('Page.enable', {})
+                tracker_id = self.driver.execute_cdp_cmd(
+                    'Page.addScriptToEvaluateOnNewDocument', {'source': NETWORK_TRACKER_SCRIPT}
+                )['identifier']
+            elif not wants_tracker and tracker_id:
+                self.driver.execute_cdp_cmd('Page.removeScriptToEvaluateOnNewDocument', {'identifier': tracker_id})
+                tracker_id = None
+            
+            state['blocked_urls'] = blocked_urls
+            state['tracker_id'] = tracker_id
+        except Exception as e:
+            # Without DevTools pages load unfiltered and the idle wait only checks readyState
+            print(f"Could not apply load profile with DevTools: {e}")
+    
+    def _wait_for_network_idle(self):
+        """Wait until the page has had no network activity for network_idle_ms"""
+        try:
+            WebDriverWait(self.driver, self.load_profile.max_wait).until(
+                lambda driver: driver.execute_script(NETWORK_IDLE_SCRIPT, self.load_profile.network_idle_ms)
+            )
+        except TimeoutException:
+            # Long-polling or streaming pages never go idle; scan what has loaded
+            print(f"Network did not go idle within {self.load_profile.max_wait} seconds; continuing")
+    
+    def _inject_axe_core(self):
+        """Make sure axe-core is available in the current page"""
+        if self.driver.execute_script("return typeof axe !== 'undefined';"):
+            return
+        
+        # Registration failed or the page replaced window.axe; inject directly
+        self.driver.execute_script(load_axe_script())
+        # axe-coreがロードされるまで待機
+        WebDriverWait(self.driver, 10).until(
+            lambda driver: driver.execute_script("return typeof axe !== 'undefined';")
+        )
+    
+    def run_axe_core_analysis(self, url: str, wcag_levels: list = None) -> Dict[str, Any]:
+        """
+        Run axe-core accessibility analysis on the given URL
         
         Args:
             url: The URL to analyze
+            wcag_levels: List of WCAG levels to analyze
             
         Returns:
-            Dictionary containing page content and metadata
+            Dictionary containing axe-core results
         """
+        if not self._setup_driver():
+            raise Exception("Failed to setup WebDriver")
+        
         try:
-            # Get page with requests first for basic content
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
+            self._load_page(url)
+            return self._run_axe(wcag_levels)
+            
+        except Exception as e:
+            if is_browser_failure(e):
+                # The browser itself failed; don't hand it to the next scan
+                self._teardown_driver(discard=True)
+            raise Exception(f"Error during axe-core analysis: {str(e)}")
+        
+        finally:
+            self._teardown_driver()
+    
+    def analyze(self, url: str, wcag_levels: list = None, include_automated: bool = True,
+                include_content: bool = True) -> Dict[str, Any]:
+        """
+        Run axe-core and extract page content from a single browser visit
+        
+        The content is taken from the rendered DOM Chrome already has, so the page
+        is fetched once and the AI input matches what axe evaluated.
+        
+        Args:
+            url: The URL to analyze
+            wcag_levels: List of WCAG levels to analyze
+            include_automated: Run axe-core on the page
+            include_content: Extract page content for AI analysis
             
-            response = requests.get(url, headers=headers, timeout=30)
-            response.raise_for_status()
+        Returns:
+            Dictionary with 'automated_results' and 'page_content' (None when not requested)
+        """
+        if not self._setup_driver():
+            raise Exception("Failed to setup WebDriver")
+        
+        results = {'automated_results': None, 'page_content': None}
+        try:
+            self._load_page(url)
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            if include_content:
+                # Snapshot the DOM before axe adds anything to it
+                html = self.driver.execute_script("return document.documentElement.outerHTML;")
+                results['page_content'] = self._extract_page_content(url, html)
             
-            # Extract key content for AI analysis
-            content = {
-                'url': url,
-                'title': soup.title.string if soup.title else '',
-                'headings': self._extract_headings(soup),
-                'images': self._extract_images(soup),
-                'links': self._extract_links(soup),
-                'forms': self._extract_forms(soup),
-                'text_content': soup.get_text()[:5000],  # First 5000 chars
-                'html_structure': str(soup)[:10000],  # First 10000 chars of HTML
-                'meta_tags': self._extract_meta_tags(soup)
-            }
+            if include_automated:
+                results['automated_results'] = self._run_axe(wcag_levels)
             
-            return content
+            return results
             
         except Exception as e:
-            raise Exception(f"Error extracting page content: {str(e)}")
+            if is_browser_failure(e):
+                # The browser itself failed; don't hand it to the next scan
+                self._teardown_driver(discard=True)
+            raise Exception(f"Error during page analysis: {str(e)}")
+        
+        finally:
+            self._teardown_driver()
     
-    def _extract_headings(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
-        """Extract heading structure from the page"""
-        headings = []
-        for i in range(1, 7):
-            for heading in soup.find_all(f'h{i}'):
-                headings.append({
-                    'level': i,
-                    'text': heading.get_text().strip(),
-                    'tag': heading.name
-                })
-        return headings
+    def _load_page(self, url: str):
+        """Navigate the current driver to the URL and wait as the load profile says"""
+        self._prepare_tab()
+        
+        # Navigate to the URL
+        self.driver.get(url)
+        
+        # Wait for page to load
+        WebDriverWait(self.driver, self.load_profile.max_wait).until(
+            EC.presence_of_element_located((By.TAG_NAME, "body"))
+        )
+        
+        if self.load_profile.network_idle_ms:
+            self._wait_for_network_idle()
     
-    def _extract_images(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
-        """Extract image information for accessibility analysis"""
-        images = []
-        for img in soup.find_all('img'):
-            images.append({
-                'src': img.get('src', ''),
-                'alt': img.get('alt', ''),
-                'title': img.get('title', ''),
-                'has_alt': bool(img.get('alt'))
-            })
-        return images
+    def _run_axe(self, wcag_levels: list = None) -> Dict[str, Any]:
+        """Run axe-core in the loaded page and return processed results"""
+        # Inject axe-core
+        self._inject_axe_core()
+        
+        axe_options = self._build_axe_options(wcag_levels)
+        
+        # Run axe-core analysis with options; results are trimmed before transfer
+        axe_results = self.driver.execute_async_script(RUN_AXE_SCRIPT, axe_options, self._result_limits())
+        
+        # Process and clean results
+        if axe_results is None:
+            raise Exception("axe.run did not return any results (None). JavaScript execution may have failed.")
+        return self._process_axe_results(axe_results)
     
-    def _extract_links(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
-        """Extract link information for accessibility analysis"""
-        links = []
-        for link in soup.find_all('a'):
-            links.append({
-                'href': link.get('href', ''),
-                'text': link.get_text().strip(),
-                'title': link.get('title', ''),
-                'has_text': bool(link.get_text().strip())
-            })
-        return links
+    def scan_many(self, urls: List[str], wcag_levels: list = None, concurrency: int = 4,
+                  page_timeout: float = 30.0) -> Iterator[Dict[str, Any]]:
+        """
+        Scan several URLs concurrently in tabs of a single Chrome process
+        
+        Navigations are started in up to `concurrency` tabs at once and axe.run is
+        started in each tab as soon as its page has loaded, so page loads and rule
+        evaluation overlap across tabs.
+        
+        Args:
+            urls: The URLs to analyze
+            wcag_levels: List of WCAG levels to analyze
+            concurrency: Number of tabs to keep busy
+            page_timeout: Seconds allowed per URL for load plus axe.run
+            
+        Yields:
+            Dictionaries with 'url', 'automated_results' and 'error', in completion order
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        
+        urls = list(urls)
+        if not urls:
+            return
+        
+        if not self._setup_driver():
+            raise Exception("Failed to setup WebDriver")
+        
+        axe_options = self._build_axe_options(wcag_levels)
+        status = {'browser_failed': False}
+        try:
+            jobs = [(url, axe_options) for url in urls]
+            for index, axe_results, error in self._run_tab_jobs(jobs, concurrency, page_timeout, status):
+                url = urls[index]
+                if error is None:
+                    try:
+                        yield {'url': url, 'automated_results': self._process_axe_results(axe_results), 'error': None}
+                        continue
+                    except Exception as e:
+                        error = e
+                yield self._scan_error(url, error)
+        finally:
+            self._teardown_driver(discard=status['browser_failed'])
     
-    def _extract_forms(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
-        """Extract form information for accessibility analysis"""
-        forms = []
-        for form in soup.find_all('form'):
-            form_data = {
-                'action': form.get('action', ''),
-                'method': form.get('method', ''),
-                'inputs': []
-            }
+    def run_sharded_axe_analysis(self, url: str, wcag_levels: list = None, shards: int = 4,
+                                 page_timeout: float = 120.0) -> Dict[str, Any]:
+        """
+        Run axe-core on one URL with the rule set split across parallel tabs
+        
+        Every tab loads the same URL and runs a disjoint subset of the selected
+        rules, so the rule evaluation of very large DOMs is spread over several
+        renderer threads. The shard results are merged into the usual structure.
+        
+        Args:
+            url: The URL to analyze
+            wcag_levels: List of WCAG levels to analyze
+            shards: Number of tabs (rule subsets) to use
+            page_timeout: Seconds allowed per shard for load plus axe.run
+            
+        Returns:
+            Dictionary containing axe-core results
+        """
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        
+        if not self._setup_driver():
+            raise Exception("Failed to setup WebDriver")
+        
+        status = {'browser_failed': False}
+        try:
+            axe_options = self._build_axe_options(wcag_levels)
+            rule_ids = self._get_axe_rule_ids(axe_options['runOnly']['values'])
+            
+            # Round-robin keeps expensive neighbouring rules apart
+            rule_shards = [rule_ids[i::shards] for i in range(shards) if rule_ids[i::shards]]
+            jobs = []
+            for rule_shard in rule_shards:
+                shard_options = dict(axe_options)
+                shard_options['runOnly'] = {'type': 'rule', 'values': rule_shard}
+                jobs.append((url, shard_options))
+            
+            merged = {'violations': [], 'passes': [], 'incomplete': [], 'inapplicable': []}
+            for _, axe_results, error in self._run_tab_jobs(jobs, len(jobs), page_timeout, status):
+                if error is not None:
+                    raise error
+                if 'error' in axe_results:
+                    raise Exception(f"axe-core error: {axe_results['error']}")
+                for category in merged:
+                    merged[category].extend(axe_results.get(category) or [])
             
-            for input_elem in form.find_all(['input', 'textarea', 'select']):
-                input_data = {
-                    'type': input_elem.get('type', ''),
-                    'name': input_elem.get('name', ''),
-                    'id': input_elem.get('id', ''),
-                    'label': '',
-                    'has_label': False
-                }
-                
-                # Check for associated label
-                if input_elem.get('id'):
-                    label = soup.find('label', {'for': input_elem.get('id')})
-                    if label:
-                        input_data['label'] = label.get_text().strip()
-                        input_data['has_label'] = True
-                
-                form_data['inputs'].append(input_data)
+            return self._process_axe_results(merged)
             
-            forms.append(form_data)
+        except Exception as e:
+            raise Exception(f"Error during axe-core analysis: {str(e)}")
         
-        return forms
+        finally:
+            self._teardown_driver(discard=status['browser_failed'])
     
-    def _extract_meta_tags(self, soup: BeautifulSoup) -> Dict[str, str]:
-        """Extract meta tags for accessibility analysis"""
-        meta_tags = {}
+    def _get_axe_rule_ids(self, tags: List[str]) -> List[str]:
+        """List the ids of the axe rules that runOnly with these tags would run"""
+        key = tuple(sorted(tags))
+        if key not in _axe_rule_ids_cache:
+            self._inject_axe_core()
+            _axe_rule_ids_cache[key] = self.driver.execute_script(AXE_RULE_IDS_SCRIPT, tags)
+        return _axe_rule_ids_cache[key]
+    
+    def _run_tab_jobs(self, jobs: List[Tuple[str, Dict[str, Any]]], concurrency: int, page_timeout: float,
+                      status: Dict[str, bool]) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[Exception]]]:
+        """
+        Run (url, axe_options) jobs across up to `concurrency` tabs of the current driver
+        
+        Yields (job index, raw axe results, error) in completion order. Sets
+        status['browser_failed'] when the browser itself stopped responding.
+        """
+        queue = deque(enumerate(jobs))
+        ready_states = self.load_profile.ready_states()
+        # window handle -> [job index, url, axe options, phase ('loading' or 'running'), deadline,
+        #                 time the page reached a ready state (None before)]
+        active = {}
+        
+        free_tabs = [self.driver.current_window_handle]
+        for _ in range(min(concurrency, len(queue)) - 1):
+            self.driver.switch_to.new_window('tab')
+            free_tabs.append(self.driver.current_window_handle)
         
-        for meta in soup.find_all('meta'):
-            name = meta.get('name') or meta.get('property')
-            content = meta.get('content')
+        while queue or active:
+            # Start navigations in idle tabs
+            while free_tabs and queue:
+                handle = free_tabs.pop()
+                index, (url, axe_options) = queue.popleft()
+                try:
+                    self.driver.switch_to.window(handle)
+                    self._prepare_tab()
+                    self._start_navigation(url)
+                    active[handle] = [index, url, axe_options, 'loading', time.monotonic() + page_timeout, None]
+                except Exception as e:
+                    free_tabs.append(handle)
+                    yield index, None, e
             
-            if name and content:
-                meta_tags[name] = content
+            progressed = False
+            for handle, state in list(active.items()):
+                index, url, axe_options, phase, deadline, ready_since = state
+                try:
+                    self.driver.switch_to.window(handle)
+                    if phase == 'loading':
+                        navigation_state = self.driver.execute_script(NAVIGATION_STATE_SCRIPT)
+                        if navigation_state == 'failed':
+                            raise Exception(f"Failed to load {url}")
+                        if navigation_state in ready_states and ready_since is None:
+                            ready_since = state[5] = time.monotonic()
+                        if ready_since is not None and self._network_idle_or_given_up(ready_since, deadline):
+                            self._inject_axe_core()
+                            self.driver.execute_script(START_AXE_SCRIPT, axe_options, self._result_limits())
+                            state[3] = 'running'
+                            progressed = True
+                        elif time.monotonic() > deadline:
+                            raise TimeoutException(f"Page did not load within {page_timeout} seconds")
+                    else:
+                        axe_results = self.driver.execute_script(AXE_RESULT_SCRIPT)
+                        if axe_results is not None:
+                            del active[handle]
+                            free_tabs.append(handle)
+                            progressed = True
+                            yield index, axe_results, None
+                        elif time.monotonic() > deadline:
+                            raise TimeoutException(f"axe.run did not finish within {page_timeout} seconds")
+                except Exception as e:
+                    if is_browser_failure(e):
+                        status['browser_failed'] = True
+                    active.pop(handle, None)
+                    self._stop_tab(handle)
+                    free_tabs.append(handle)
+                    progressed = True
+                    yield index, None, e
+            
+            if not progressed:
+                time.sleep(TAB_POLL_INTERVAL)
+    
+    def _start_navigation(self, url: str):
+        """
+        Start loading a URL in the current tab without waiting for the load
+        
+        DevTools Page.navigate makes this a browser-initiated navigation, like
+        typing the URL: the previous page isn't sent as Referer, and data: URLs
+        are allowed.
+        """
+        self.driver.execute_script(MARK_NAVIGATION_PENDING_SCRIPT)
+        result = self.driver.execute_cdp_cmd('Page.navigate', {'url': url})
+        if result.get('errorText'):
+            raise Exception(f"Failed to load {url}: {result['errorText']}")
+        if not result.get('loaderId'):
+            # Same-document (fragment) navigation: no new document replaces the marked one
+            self.driver.execute_script(CLEAR_NAVIGATION_PENDING_SCRIPT)
+    
+    def _network_idle(self) -> bool:
+        """Whether the current tab satisfies the load profile's network idle condition"""
+        if not self.load_profile.network_idle_ms:
+            return True
+        return bool(self.driver.execute_script(NETWORK_IDLE_SCRIPT, self.load_profile.network_idle_ms))
+    
+    def _network_idle_or_given_up(self, ready_since: float, deadline: float) -> bool:
+        """
+        Whether a loaded tab should be scanned now
+        
+        Like _wait_for_network_idle, a page whose network doesn't go idle within
+        the load profile's max_wait (or the job's deadline) is scanned as it is.
+        """
+        if self._network_idle():
+            return True
+        now = time.monotonic()
+        if now - ready_since >= self.load_profile.max_wait or now > deadline:
+            print(f"Network did not go idle within {self.load_profile.max_wait} seconds; continuing")
+            return True
+        return False
+    
+    def _stop_tab(self, handle: str):
+        """Abort whatever a tab is doing so it can take the next URL"""
+        try:
+            self.driver.switch_to.window(handle)
+            self.driver.execute_script("window.stop();")
+        except Exception:
+            pass
+    
+    def _scan_error(self, url: str, error: Exception) -> Dict[str, Any]:
+        """Build the scan_many entry for a URL that could not be analyzed"""
+        return {
+            'url': url,
+            'automated_results': None,
+            'error': f"Error during axe-core analysis: {str(error)}"
+        }
+    
+    def get_page_content(self, url: str) -> Dict[str, Any]:
+        """
+        Extract page content for AI analysis
         
-        return meta_tags
+        Args:
+            url: The URL to analyze
+            
+        Returns:
+            Dictionary containing page content and metadata
+        """
+        try:
+            # Get page over HTTP first for basic content, reusing pooled connections;
+            # the body is streamed so at most max_page_bytes of it are ever read or held
+            response = self.http_client.get(url)
+            try:
+                response.raise_for_status()
+            except Exception:
+                response.close()
+                raise
+            
+            stream = PageStream(response, self.max_page_bytes)
+            page_content = extract_page_content_from_chunks(url, stream, self.parser)
+            page_content['truncated'] = stream.truncated
+            return page_content
+            
+        except Exception as e:
+            raise Exception(f"Error extracting page content: {str(e)}")
+    
+    def _extract_page_content(self, url: str, html: str) -> Dict[str, Any]:
+        """Build the AI analysis content dictionary from an HTML document"""
+        return extract_page_content(url, html, self.parser)
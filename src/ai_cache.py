@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class EvaluationCache:
+    """
+    Persistent SQLite cache for AI criteria evaluations
+
+    Entries are keyed by a hash of everything that determines the model output
+    (prompt, criteria, provider, model, temperature), expire after ttl_seconds
+    and are evicted least-recently-used once max_entries is exceeded.
+    """
+
+    def __init__(self, path: str = ".cache/ai_evaluations.sqlite3", ttl_seconds: Optional[float] = 7 * 24 * 3600,
+                 max_entries: Optional[int] = 50000):
+        """
+        Args:
+            path: SQLite database file (':memory:' for a per-process cache)
+            ttl_seconds: Age after which an entry is ignored and removed (None keeps forever)
+            max_entries: Maximum number of entries kept (None for unbounded)
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Shared across the evaluator's worker threads; access is serialised by _lock
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS evaluations (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._connection.execute("CREATE INDEX IF NOT EXISTS idx_evaluations_accessed ON evaluations (accessed_at)")
+        self._connection.commit()
+
+    @staticmethod
+    def make_key(prompt: str, criteria_id: str, provider: str, model: str, temperature: float) -> str:
+        """Hash the inputs of one evaluation; whitespace differences don't change the key"""
+        normalized_prompt = ' '.join(prompt.split())
+        payload = json.dumps({
+            'prompt': normalized_prompt,
+            'criteria_id': criteria_id,
+            'provider': provider,
+            'model': model,
+            'temperature': temperature
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached evaluation, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, created_at FROM evaluations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                self._connection.execute("DELETE FROM evaluations WHERE key = ?", (key,))
+                self._connection.commit()
+                return None
+            self._connection.execute("UPDATE evaluations SET accessed_at = ? WHERE key = ?", (now, key))
+            self._connection.commit()
+        return json.loads(value)
+
+    def set(self, key: str, evaluation: Dict[str, Any]):
+        """Store an evaluation and evict old entries if the cache is over its limits"""
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO evaluations (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(evaluation, ensure_ascii=False), now, now)
+            )
+            if self.ttl_seconds is not None:
+                self._connection.execute("DELETE FROM evaluations WHERE created_at < ?", (now - self.ttl_seconds,))
+            if self.max_entries is not None:
+                self._connection.execute("""
+                    DELETE FROM evaluations WHERE key IN (
+                        SELECT key FROM evaluations ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                    )
+                """, (self.max_entries,))
+            self._connection.commit()
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._connection.execute("DELETE FROM evaluations")
+            self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -1,30 +1,66 @@
-import os
 import json
-from typing import Dict, List, Any, Optional
-from openai import OpenAI
-import anthropic
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple, Union
 from src.wcag_criteria import WCAG_CRITERIA
+from src.ai_cache import EvaluationCache
+from src.applicability import not_applicable_reason, not_applicable_result
+from src.axe_mapping import axe_decided_result, format_axe_findings, map_axe_results
+from src.prompt_builder import PromptBuilder, count_tokens
+from src.llm_providers import LLMProvider, LLMResponse, available_providers, create_provider
+from src.rate_limiter import RateLimiter, RetryPolicy, call_with_retries, get_rate_limiter
+
+# Response token allowance per criteria in a batched evaluation
+BATCH_MAX_TOKENS_PER_CRITERIA = 700
+
+# Shortest prompt prefix OpenAI and Anthropic write to their prompt cache
+MIN_CACHEABLE_PREFIX_TOKENS = 1024
+
+EVALUATION_TEMPERATURE = 0.1
 
 class AIEvaluator:
     """
     Handles AI-powered evaluation of manual accessibility criteria
     """
     
-    def __init__(self, provider: str = "openai"):
-        self.provider = provider.lower()
-        
-        if self.provider == "openai":
-            self.openai_client = OpenAI(
-                api_key=os.getenv("OPENAI_API_KEY")
-            )
-        elif self.provider == "anthropic":
-            self.anthropic_client = anthropic.Anthropic(
-                api_key=os.getenv("ANTHROPIC_API_KEY")
-            )
+    def __init__(self, provider: Union[str, LLMProvider] = "openai", max_concurrency: int = 1,
+                 cache: Optional[EvaluationCache] = None, rate_limiter: Optional[RateLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None, provider_options: Optional[Dict[str, Any]] = None,
+                 prompt_token_budget: int = 2500):
+        """
+        Args:
+            provider: Registered provider name ('openai', 'anthropic', 'local', ...) or a provider instance
+            max_concurrency: Maximum number of criteria evaluated in parallel
+            cache: Optional persistent cache of evaluation results
+            rate_limiter: Request/token limiter (defaults to the one shared by all evaluators of the provider)
+            retry_policy: Backoff for rate-limit, overload and transient network errors
+            provider_options: Keyword arguments for the provider (e.g. model, base_url, latency_mean)
+            prompt_token_budget: Maximum tokens of page context per AI call
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if isinstance(provider, LLMProvider):
+            self.llm = provider
         else:
-            raise ValueError("Provider must be either 'openai' or 'anthropic'")
+            self.llm = create_provider(provider, **(provider_options or {}))
+        self.provider = self.llm.name
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.model = self.llm.model
+        self.temperature = EVALUATION_TEMPERATURE
+        self.prompt_builder = PromptBuilder(token_budget=prompt_token_budget)
+        self._usage_lock = threading.Lock()
+        self.reset_usage()
+        self.rate_limiter = rate_limiter or get_rate_limiter(self.provider)
+        self.retry_policy = retry_policy or RetryPolicy()
     
-    def evaluate_manual_criteria(self, page_content: Dict[str, Any], wcag_levels: List[str], wcag_version: str = "2.1") -> Dict[str, Any]:
+    @staticmethod
+    def available_providers() -> List[str]:
+        """Names accepted by the provider argument"""
+        return available_providers()
+    
+    def evaluate_manual_criteria(self, page_content: Dict[str, Any], wcag_levels: List[str], wcag_version: str = "2.1",
+                                 automated_results: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Evaluate manual accessibility criteria using AI
         
@@ -32,35 +68,118 @@ class AIEvaluator:
             page_content: Dictionary containing page content and structure
             wcag_levels: List of WCAG levels to evaluate (A, AA, AAA)
             wcag_version: WCAG version to use (2.0, 2.1, 2.2)
+            automated_results: Optional axe-core results of the same page; criteria with
+                confirmed violations are failed without an AI call, and flagged elements
+                are given to the AI as focused context for the others
             
         Returns:
-            Dictionary containing evaluation results for each criteria
+            Dictionary containing evaluation results for each criteria; criteria the page
+            has no content for get status 'not_applicable' without an AI call
+            (token usage of the run, including prompt-cache hits, is left in self.usage)
         """
-        results = {}
+        self.reset_usage()
         
-        # Filter criteria by requested WCAG levels and version
-        criteria_to_evaluate = {
+        # Not-applicable and axe-failed criteria are decided locally, without an AI call
+        criteria_order, results, page_content, criteria_to_evaluate = self._plan_evaluation(
+            page_content, wcag_levels, wcag_version, automated_results
+        )
+        
+        if self.max_concurrency == 1 or len(criteria_to_evaluate) <= 1:
+            for criteria_id, criteria_data in criteria_to_evaluate.items():
+                results[criteria_id] = self._evaluate_criteria_isolated(criteria_id, criteria_data, page_content)
+        else:
+            criteria_items = list(criteria_to_evaluate.items())
+            warm_up = []
+            if self._estimate_tokens(self._create_prompt_prefix(page_content)) >= MIN_CACHEABLE_PREFIX_TOKENS:
+                # The first call writes the page prefix to the provider's prompt cache;
+                # starting the others only afterwards lets all of them read from it
+                warm_up, criteria_items = criteria_items[:1], criteria_items[1:]
+                for criteria_id, criteria_data in warm_up:
+                    results[criteria_id] = self._evaluate_criteria_isolated(criteria_id, criteria_data, page_content)
+            
+            # LLM calls are I/O bound, so threads give near-linear speedup up to max_concurrency
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                futures = {
+                    criteria_id: executor.submit(self._evaluate_criteria_isolated, criteria_id, criteria_data, page_content)
+                    for criteria_id, criteria_data in criteria_items
+                }
+                for criteria_id, future in futures.items():
+                    results[criteria_id] = future.result()
+        
+        print(f"AI evaluation usage: {self.usage['calls']} calls, {self.usage['input_tokens']} input tokens "
+              f"({self.usage['cached_input_tokens']} from prompt cache), {self.usage['output_tokens']} output tokens, "
+              f"{len(criteria_order) - len(criteria_to_evaluate)} criteria decided without AI")
+        return {criteria_id: results[criteria_id] for criteria_id in criteria_order}
+    
+    def _select_criteria(self, wcag_levels: List[str], wcag_version: str) -> Dict[str, Any]:
+        """Manual-assessment criteria of the requested WCAG levels and version"""
+        return {
             criteria_id: criteria_data 
             for criteria_id, criteria_data in WCAG_CRITERIA.items()
             if (criteria_data['level'] in wcag_levels and 
                 criteria_data['requires_manual_assessment'] and
                 wcag_version in criteria_data.get('versions', ['2.0', '2.1', '2.2']))
         }
+    
+    def _plan_evaluation(self, page_content: Dict[str, Any], wcag_levels: List[str], wcag_version: str,
+                         automated_results: Optional[Dict[str, Any]]) -> Tuple[List[str], Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """
+        Decide what can be settled locally before any AI call
         
-        for criteria_id, criteria_data in criteria_to_evaluate.items():
-            try:
-                evaluation = self._evaluate_single_criteria(criteria_id, criteria_data, page_content)
-                results[criteria_id] = evaluation
-            except Exception as e:
-                results[criteria_id] = {
-                    'status': 'error',
-                    'error': str(e),
-                    'level': criteria_data['level'],
-                    'title': criteria_data['title']
-                }
-        
+        Returns:
+            (criteria ids in WCAG_CRITERIA order, locally decided results,
+             page content for the prompts, criteria that still need the AI)
+        """
+        criteria = self._select_criteria(wcag_levels, wcag_version)
+        results = self._not_applicable_results(criteria.items(), page_content)
+        page_content, axe_decided = self._apply_axe_results(criteria.items(), page_content, automated_results)
+        results.update(axe_decided)
+        criteria_to_evaluate = {
+            criteria_id: criteria_data for criteria_id, criteria_data in criteria.items()
+            if criteria_id not in results
+        }
+        return list(criteria), results, page_content, criteria_to_evaluate
+    
+    def _not_applicable_results(self, criteria_items, page_content: Dict[str, Any]) -> Dict[str, Any]:
+        """Results for the criteria that the page content shows don't apply"""
+        results = {}
+        for criteria_id, criteria_data in criteria_items:
+            reason = not_applicable_reason(criteria_id, page_content)
+            if reason is not None:
+                results[criteria_id] = not_applicable_result(criteria_id, criteria_data, reason)
         return results
     
+    def _apply_axe_results(self, criteria_items, page_content: Dict[str, Any],
+                           automated_results: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Reuse axe-core results for the given criteria
+        
+        Returns:
+            (page content with per-criteria 'axe_findings' for the prompts, results of criteria axe already failed)
+        """
+        axe_findings = map_axe_results(automated_results)
+        if not axe_findings:
+            return page_content, {}
+        
+        decided = {}
+        for criteria_id, criteria_data in criteria_items:
+            result = axe_decided_result(criteria_id, criteria_data, axe_findings.get(criteria_id))
+            if result is not None:
+                decided[criteria_id] = result
+        return dict(page_content, axe_findings=axe_findings), decided
+    
+    def _evaluate_criteria_isolated(self, criteria_id: str, criteria_data: Dict[str, Any], page_content: Dict[str, Any]) -> Dict[str, Any]:
+        """Evaluate one criteria, turning any failure into an error result"""
+        try:
+            return self._evaluate_single_criteria(criteria_id, criteria_data, page_content)
+        except Exception as e:
+            return {
+                'status': 'error',
+                'error': str(e),
+                'level': criteria_data['level'],
+                'title': criteria_data['title']
+            }
+    
     def _evaluate_single_criteria(self, criteria_id: str, criteria_data: Dict[str, Any], page_content: Dict[str, Any]) -> Dict[str, Any]:
         """
         Evaluate a single WCAG criteria using AI
@@ -74,21 +193,47 @@ class AIEvaluator:
             Dictionary containing evaluation result
         """
         # Prepare context for AI evaluation
-        evaluation_prompt = self._create_evaluation_prompt(criteria_id, criteria_data, page_content)
+        prefix, suffix = self._create_prompt_parts(criteria_id, criteria_data, page_content)
+        evaluation_prompt = prefix + suffix
         
-        if self.provider == "openai":
-            response = self._evaluate_with_openai(evaluation_prompt)
-        else:
-            response = self._evaluate_with_anthropic(evaluation_prompt)
+        cache_key = self._cache_key(criteria_id, evaluation_prompt)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        response = self._complete(prefix, suffix)
         
         # Parse and structure the response
-        return self._parse_ai_response(response, criteria_data)
+        evaluation = self._parse_ai_response(response, criteria_data)
+        self._store_in_cache(cache_key, evaluation)
+        return evaluation
+    
+    def _cache_key(self, criteria_id: str, evaluation_prompt: str) -> Optional[str]:
+        """Cache key of a single-criteria evaluation, or None without a cache"""
+        if self.cache is None:
+            return None
+        return EvaluationCache.make_key(evaluation_prompt, criteria_id, self.provider, self.model, self.temperature)
+    
+    def _store_in_cache(self, cache_key: Optional[str], evaluation: Dict[str, Any]):
+        """Cache an evaluation unless it is a failure worth retrying"""
+        if cache_key is not None and evaluation.get('status') != 'error':
+            self.cache.set(cache_key, evaluation)
     
     def _create_evaluation_prompt(self, criteria_id: str, criteria_data: Dict[str, Any], page_content: Dict[str, Any]) -> str:
         """Create a comprehensive prompt for AI evaluation"""
+        prefix, suffix = self._create_prompt_parts(criteria_id, criteria_data, page_content)
+        return prefix + suffix
+    
+    def _create_prompt_parts(self, criteria_id: str, criteria_data: Dict[str, Any], page_content: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        Split the evaluation prompt into a page prefix and a criteria suffix
         
-        prompt = f"""
-You are an expert web accessibility auditor specializing in WCAG compliance evaluation.
+        The prefix only depends on the page, so it is byte-identical for every
+        criteria of a run and can be served from the provider's prompt cache.
+        The suffix starts with the page sections relevant to the criteria.
+        """
+        suffix = f"""{self.prompt_builder.criteria_context([criteria_id], page_content)}
 
 **WCAG Criteria to Evaluate:**
 - ID: {criteria_id}
@@ -98,35 +243,70 @@ You are an expert web accessibility auditor specializing in WCAG compliance eval
 
 **Evaluation Guidelines:**
 {criteria_data['evaluation_guidelines']}
+{self._format_axe_findings(criteria_id, page_content)}
+**Required Response Format:**
+Provide your evaluation in JSON format with the following structure:
+{{
+    "status": "pass|fail|warning",
+    "confidence": 0.0-1.0,
+    "assessment": "Detailed explanation of your evaluation",
+    "issues": ["List of specific issues found (if any)"],
+    "recommendations": ["Specific actionable recommendations"],
+    "priority": "low|medium|high|critical"
+}}
 
-**Page Content Analysis:**
-
-**URL:** {page_content.get('url', 'Unknown')}
-**Page Title:** {page_content.get('title', 'No title')}
-
-**Headings Structure:**
-{json.dumps(page_content.get('headings', [])[:10], indent=2)}
-
-**Images (first 10):**
-{json.dumps(page_content.get('images', [])[:10], indent=2)}
+**Evaluation Instructions:**
+1. Thoroughly analyze the provided page content against the WCAG criteria
+2. Consider both the presence and quality of accessibility features
+3. Provide specific, actionable recommendations
+4. Assign appropriate priority based on impact and user experience
+5. Be conservative - if uncertain, lean towards "warning" status with recommendations
 
-**Links (first 10):**
-{json.dumps(page_content.get('links', [])[:10], indent=2)}
+Please evaluate this page against WCAG criteria {criteria_id} and provide your assessment in the required JSON format.
+"""
+        
+        return self._create_prompt_prefix(page_content), suffix
+    
+    def _create_prompt_prefix(self, page_content: Dict[str, Any]) -> str:
+        """Page-dependent part of every evaluation prompt"""
+        return f"""
+You are an expert web accessibility auditor specializing in WCAG compliance evaluation.
 
-**Forms:**
-{json.dumps(page_content.get('forms', []), indent=2)}
+{self._format_page_context(page_content)}
+"""
+    
+    def _format_page_context(self, page_content: Dict[str, Any]) -> str:
+        """Format the page summary shared by all evaluation prompts"""
+        return self.prompt_builder.shared_context(page_content)
+    
+    def _format_axe_findings(self, criteria_id: str, page_content: Dict[str, Any]) -> str:
+        """axe-core findings for one criteria, or '' so prompts without axe results are unchanged"""
+        return format_axe_findings(page_content.get('axe_findings', {}).get(criteria_id))
+    
+    def _create_batch_prompt_parts(self, criteria_items: List[tuple], page_content: Dict[str, Any]) -> Tuple[str, str]:
+        """Create one prompt that carries the page context once and several criteria, as (prefix, suffix)"""
+        criteria_sections = "\n\n".join(
+            f"""### Criteria {criteria_id}
+- Title: {criteria_data['title']}
+- Level: {criteria_data['level']}
+- Description: {criteria_data['description']}
 
-**Meta Tags:**
-{json.dumps(page_content.get('meta_tags', {}), indent=2)}
+Evaluation Guidelines:
+{criteria_data['evaluation_guidelines']}{self._format_axe_findings(criteria_id, page_content)}"""
+            for criteria_id, criteria_data in criteria_items
+        )
+        criteria_ids = ", ".join(f'"{criteria_id}"' for criteria_id, _ in criteria_items)
+        page_sections = self.prompt_builder.criteria_context([criteria_id for criteria_id, _ in criteria_items], page_content)
+        
+        suffix = f"""{page_sections}
 
-**Text Content (excerpt):**
-{page_content.get('text_content', '')[:1000]}
+**WCAG Criteria to Evaluate:**
 
-**HTML Structure (excerpt):**
-{page_content.get('html_structure', '')[:2000]}
+{criteria_sections}
 
 **Required Response Format:**
-Provide your evaluation in JSON format with the following structure:
+Provide your evaluation as a single JSON object with one key per criteria ID ({criteria_ids}).
+Each value must have the following structure:
 {{
     "status": "pass|fail|warning",
     "confidence": 0.0-1.0,
@@ -137,67 +317,72 @@ Provide your evaluation in JSON format with the following structure:
 }}
 
 **Evaluation Instructions:**
-1. Thoroughly analyze the provided page content against the WCAG criteria
+1. Evaluate each criteria independently against the page content above
 2. Consider both the presence and quality of accessibility features
 3. Provide specific, actionable recommendations
 4. Assign appropriate priority based on impact and user experience
 5. Be conservative - if uncertain, lean towards "warning" status with recommendations
 
-Please evaluate this page against WCAG criteria {criteria_id} and provide your assessment in the required JSON format.
+Please evaluate this page against WCAG criteria {criteria_ids} and provide your assessment in the required JSON format.
 """
         
-        return prompt
+        return self._create_prompt_prefix(page_content), suffix
     
-    def _evaluate_with_openai(self, prompt: str) -> str:
-        """Evaluate using OpenAI GPT-4o"""
+    def _complete(self, prefix: str, suffix: str = "", max_tokens: int = 2000) -> str:
+        """
+        Send a prompt to the configured provider and return the raw response text
+        
+        Args:
+            prefix: Stable leading part of the prompt (page context), eligible for prompt caching
+            suffix: Per-request remainder of the prompt
+            max_tokens: Maximum response tokens
+        """
         try:
-            # the newest OpenAI model is "gpt-4o" which was released May 13, 2024. do not change this unless explicitly requested by the user
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert web accessibility auditor. Analyze the provided content and respond with valid JSON only."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1,
-                max_tokens=2000
+            estimated_tokens = self._estimate_tokens(prefix + suffix) + max_tokens
+            response = call_with_retries(
+                lambda: self.llm.complete(prefix, suffix, max_tokens, self.temperature),
+                self.rate_limiter, estimated_tokens, self.retry_policy, self.llm.is_retryable
             )
-            
-            return response.choices[0].message.content or ""
+            self._record_response(response)
+            self.rate_limiter.record_usage(estimated_tokens, response.rate_limited_tokens)
+            return response.text
             
         except Exception as e:
-            raise Exception(f"OpenAI evaluation failed: {str(e)}")
+            raise Exception(f"{self.llm.display_name} evaluation failed: {str(e)}")
     
-    def _evaluate_with_anthropic(self, prompt: str) -> str:
-        """Evaluate using Anthropic Claude"""
-        try:
-            # the newest Anthropic model is "claude-3-5-sonnet-20241022" which was released October 22, 2024
-            response = self.anthropic_client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=2000,
-                temperature=0.1,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt + "\n\nPlease respond with valid JSON only, no additional text or explanation outside the JSON structure."
-                    }
-                ]
-            )
-            
-            content = response.content[0]
-            if hasattr(content, 'text'):
-                return content.text
-            else:
-                return str(content)
-            
-        except Exception as e:
-            raise Exception(f"Anthropic evaluation failed: {str(e)}")
+    def _record_response(self, response: LLMResponse):
+        """Add the token usage of a provider response to the current run"""
+        self._record_usage(
+            input_tokens=response.input_tokens,
+            cached_input_tokens=response.cached_input_tokens,
+            cache_creation_input_tokens=response.cache_creation_input_tokens,
+            output_tokens=response.output_tokens
+        )
+    
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        return count_tokens(text) + 1
+    
+    def _record_usage(self, input_tokens: int = 0, cached_input_tokens: int = 0,
+                      cache_creation_input_tokens: int = 0, output_tokens: int = 0):
+        """Add one call's token counts to the usage of the current run"""
+        with self._usage_lock:
+            self.usage['calls'] += 1
+            self.usage['input_tokens'] += input_tokens
+            self.usage['cached_input_tokens'] += cached_input_tokens
+            self.usage['cache_creation_input_tokens'] += cache_creation_input_tokens
+            self.usage['output_tokens'] += output_tokens
+    
+    def reset_usage(self):
+        """Start a new usage tally (done automatically by evaluate_manual_criteria)"""
+        with self._usage_lock:
+            self.usage = {
+                'calls': 0,
+                'input_tokens': 0,
+                'cached_input_tokens': 0,
+                'cache_creation_input_tokens': 0,
+                'output_tokens': 0
+            }
     
     def _parse_ai_response(self, response: str, criteria_data: Dict[str, Any]) -> Dict[str, Any]:
         """Parse and validate AI response"""
@@ -236,8 +421,8 @@ Please evaluate this page against WCAG criteria {criteria_id} and provide your a
             
             return evaluation
             
-        except json.JSONDecodeError:
-            # Fallback for invalid JSON
+        except (json.JSONDecodeError, TypeError, ValueError, AttributeError):
+            # Fallback for invalid JSON or fields of the wrong type (e.g. "confidence": "high", "status": null)
             return {
                 'status': 'error',
                 'confidence': 0.0,
@@ -262,24 +447,88 @@ Please evaluate this page against WCAG criteria {criteria_id} and provide your a
         }
         return defaults.get(field, None)
     
-    def evaluate_batch_criteria(self, page_content: Dict[str, Any], criteria_list: List[str]) -> Dict[str, Any]:
+    def evaluate_batch_criteria(self, page_content: Dict[str, Any], criteria_list: List[str], batch_size: int = 5,
+                                automated_results: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
-        Evaluate multiple criteria in a single AI call for efficiency
+        Evaluate multiple criteria with one AI call per batch for efficiency
+        
+        The page context is sent once per batch instead of once per criteria.
+        Criteria whose batch response can't be parsed are re-evaluated one by one.
         
         Args:
             page_content: Page content to analyze
             criteria_list: List of criteria IDs to evaluate
+            batch_size: Maximum number of criteria per AI call
+            automated_results: Optional axe-core results of the same page (see evaluate_manual_criteria)
             
         Returns:
             Dictionary with evaluation results for each criteria
         """
-        # This could be implemented for more efficient batch processing
-        # For now, we'll use individual evaluations
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        
+        criteria_items = [(criteria_id, WCAG_CRITERIA[criteria_id]) for criteria_id in criteria_list if criteria_id in WCAG_CRITERIA]
+        not_applicable = self._not_applicable_results(criteria_items, page_content)
+        page_content, axe_decided = self._apply_axe_results(criteria_items, page_content, automated_results)
+        decided = dict(not_applicable, **axe_decided)
+        applicable_items = [item for item in criteria_items if item[0] not in decided]
+        batches = [applicable_items[i:i + batch_size] for i in range(0, len(applicable_items), batch_size)]
+        
+        results = decided
+        if self.max_concurrency == 1 or len(batches) <= 1:
+            for batch in batches:
+                results.update(self._evaluate_criteria_batch(batch, page_content))
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                for batch_results in executor.map(lambda batch: self._evaluate_criteria_batch(batch, page_content), batches):
+                    results.update(batch_results)
+        
+        # Return in the requested order
+        return {criteria_id: results[criteria_id] for criteria_id, _ in criteria_items}
+    
+    def _evaluate_criteria_batch(self, criteria_items: List[tuple], page_content: Dict[str, Any]) -> Dict[str, Any]:
+        """Evaluate one batch of criteria, falling back to single calls for anything unparseable"""
         results = {}
+        cache_keys = {}
+        if self.cache is not None:
+            # Batch results are stored under the single-criteria key, so both paths share entries
+            for criteria_id, criteria_data in criteria_items:
+                cache_key = self._cache_key(criteria_id, self._create_evaluation_prompt(criteria_id, criteria_data, page_content))
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    results[criteria_id] = cached
+                else:
+                    cache_keys[criteria_id] = cache_key
+            criteria_items = [item for item in criteria_items if item[0] not in results]
         
-        for criteria_id in criteria_list:
-            if criteria_id in WCAG_CRITERIA:
-                criteria_data = WCAG_CRITERIA[criteria_id]
+        if len(criteria_items) <= 1:
+            for criteria_id, criteria_data in criteria_items:
                 results[criteria_id] = self._evaluate_single_criteria(criteria_id, criteria_data, page_content)
+            return results
+        
+        batch_evaluations = {}
+        try:
+            prefix, suffix = self._create_batch_prompt_parts(criteria_items, page_content)
+            response = self._complete(prefix, suffix, max_tokens=max(2000, BATCH_MAX_TOKENS_PER_CRITERIA * len(criteria_items)))
+            parsed = json.loads(response)
+            if isinstance(parsed, dict):
+                batch_evaluations = parsed
+        except Exception as e:
+            print(f"Batch evaluation failed, falling back to single criteria: {e}")
+        
+        for criteria_id, criteria_data in criteria_items:
+            evaluation = batch_evaluations.get(criteria_id)
+            if isinstance(evaluation, dict):
+                # One malformed entry only sends its own criteria down the single-criteria path
+                try:
+                    result = self._parse_ai_response(json.dumps(evaluation), criteria_data)
+                except Exception as e:
+                    print(f"Invalid batch entry for {criteria_id}, evaluating it alone: {e}")
+                    result = None
+                if result is not None and result['status'] != 'error':
+                    self._store_in_cache(cache_keys.get(criteria_id), result)
+                    results[criteria_id] = result
+                    continue
+            results[criteria_id] = self._evaluate_single_criteria(criteria_id, criteria_data, page_content)
         
         return results
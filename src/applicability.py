@@ -0,0 +1,86 @@
+"""
+Deterministic applicability checks for WCAG criteria
+
+Some criteria only apply when the page contains a certain kind of content
+(time-based media, form controls, links...). These checks run on the
+page_content dictionary from AccessibilityChecker.get_page_content so that
+criteria with nothing to evaluate are marked 'not_applicable' without an AI
+call. Missing page_content fields are treated as "unknown", never as absent
+content, and so is everything on pages that were only partly downloaded.
+"""
+
+from typing import Any, Dict, Optional
+
+
+def _has_media(page_content: Dict[str, Any]) -> Optional[bool]:
+    media = page_content.get('media')
+    if media is None:
+        return None
+    return any(media.get(kind, 0) for kind in ('audio', 'video', 'embedded', 'linked'))
+
+
+def _has_form_controls(page_content: Dict[str, Any]) -> Optional[bool]:
+    if 'form_controls' not in page_content:
+        return None
+    return page_content['form_controls'] > 0 or any(form.get('inputs') for form in page_content.get('forms', []))
+
+
+def _has_links(page_content: Dict[str, Any]) -> Optional[bool]:
+    if 'links' not in page_content:
+        return None
+    return len(page_content['links']) > 0
+
+
+def _has_headings_or_labels(page_content: Dict[str, Any]) -> Optional[bool]:
+    if 'headings' not in page_content:
+        return None
+    has_controls = _has_form_controls(page_content)
+    if has_controls is None:
+        return None
+    return len(page_content['headings']) > 0 or has_controls
+
+
+# Criteria id -> (check returning True/False/None for unknown, reason used when the content is absent)
+APPLICABILITY_RULES: Dict[str, tuple] = {
+    "1.2.1": (_has_media, "The page contains no audio, video or embedded media."),
+    "1.2.2": (_has_media, "The page contains no audio, video or embedded media."),
+    "2.4.4": (_has_links, "The page contains no links."),
+    "2.4.6": (_has_headings_or_labels, "The page contains no headings and no form controls that need labels."),
+    "3.2.2": (_has_form_controls, "The page contains no user input controls."),
+    "3.3.1": (_has_form_controls, "The page contains no user input controls, so no input errors can occur."),
+    "3.3.2": (_has_form_controls, "The page contains no user input controls that need labels or instructions.")
+}
+
+
+def not_applicable_reason(criteria_id: str, page_content: Dict[str, Any]) -> Optional[str]:
+    """
+    Check whether a criteria has anything to evaluate on the page
+
+    Args:
+        criteria_id: WCAG criteria id (e.g. '1.2.1')
+        page_content: Dictionary from get_page_content
+
+    Returns:
+        The reason the criteria does not apply, or None if it applies (or can't be decided locally)
+    """
+    rule = APPLICABILITY_RULES.get(criteria_id)
+    if rule is None or page_content.get('truncated'):
+        # Content past the download cap may be exactly what the criteria applies to
+        return None
+    check, reason = rule
+    return reason if check(page_content) is False else None
+
+
+def not_applicable_result(criteria_id: str, criteria_data: Dict[str, Any], reason: str) -> Dict[str, Any]:
+    """Build an evaluation result, in the same shape as an AI evaluation, for a criteria that doesn't apply"""
+    return {
+        'status': 'not_applicable',
+        'confidence': 1.0,
+        'assessment': reason,
+        'issues': [],
+        'recommendations': [],
+        'priority': 'low',
+        'level': criteria_data['level'],
+        'title': criteria_data['title'],
+        'criteria_id': criteria_id
+    }
@@ -0,0 +1,384 @@
+"""
+asyncio accessibility checker that drives Chrome over the DevTools protocol
+
+One browser websocket is multiplexed across many tabs (flattened target
+sessions), so a single event loop can keep dozens of page loads and axe runs in
+flight without a thread per page.
+"""
+
+import asyncio
+import itertools
+import json
+import re
+import shutil
+import tempfile
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+import websockets
+from src.accessibility_checker import TAB_POLL_INTERVAL, TRIM_AXE_RESULTS_FUNCTION, AxeScanner, load_axe_script
+from src.driver_pool import build_chrome_options
+from src.load_profile import NETWORK_IDLE_SCRIPT, NETWORK_TRACKER_SCRIPT, LoadProfile
+
+CHROME_BINARIES = ['google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome']
+
+DEVTOOLS_URL_PATTERN = re.compile(r'DevTools listening on (ws://\S+)')
+
+
+class DevToolsError(Exception):
+    """Raised when Chrome answers a DevTools command with an error"""
+
+
+class DevToolsConnection:
+    """
+    Minimal async DevTools client over a single browser-level websocket
+    """
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._reader = asyncio.create_task(self._read_loop())
+
+    @classmethod
+    async def connect(cls, ws_url: str) -> 'DevToolsConnection':
+        # axe results for large pages easily exceed the default 1 MB frame limit
+        websocket = await websockets.connect(ws_url, max_size=None)
+        return cls(websocket)
+
+    async def send(self, method: str, params: Optional[Dict[str, Any]] = None,
+                   session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Send a command and wait for its result"""
+        message_id = next(self._ids)
+        message = {'id': message_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        try:
+            await self.websocket.send(json.dumps(message))
+            return await future
+        finally:
+            self._pending.pop(message_id, None)
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        self._listeners.remove(listener)
+
+    async def close(self):
+        self._reader.cancel()
+        await self.websocket.close()
+
+    async def _read_loop(self):
+        try:
+            async for raw in self.websocket:
+                message = json.loads(raw)
+                if 'id' in message:
+                    future = self._pending.get(message['id'])
+                    if future is None or future.done():
+                        continue
+                    if 'error' in message:
+                        future.set_exception(DevToolsError(message['error'].get('message', str(message['error']))))
+                    else:
+                        future.set_result(message.get('result', {}))
+                else:
+                    for listener in list(self._listeners):
+                        listener(message)
+        except Exception as e:
+            error = e
+        else:
+            error = DevToolsError("DevTools connection closed")
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+
+class AsyncAccessibilityChecker(AxeScanner):
+    """
+    asyncio variant of AccessibilityChecker built on the DevTools protocol
+
+    Shares the axe option and result handling of AccessibilityChecker, so run()
+    returns exactly the same structure as run_axe_core_analysis() for the same
+    load profile and result settings.
+    """
+
+    def __init__(self, browser_ws_url: Optional[str] = None, chrome_path: Optional[str] = None,
+                 max_concurrency: int = 16, page_timeout: float = 30.0,
+                 load_profile: Optional[LoadProfile] = None, result_types: Optional[List[str]] = None,
+                 max_nodes_per_rule: Optional[int] = None, max_html_length: Optional[int] = None):
+        """
+        Args:
+            browser_ws_url: DevTools websocket of an already running Chrome; when
+                omitted a headless Chrome is launched on start()
+            chrome_path: Chrome executable to launch (searched on PATH by default)
+            max_concurrency: Maximum pages loading or running axe at the same time
+            page_timeout: Seconds allowed per URL for load plus axe.run
+            load_profile: Request blocking, load event and network idle wait (full load by default)
+            result_types: axe resultTypes, e.g. ['violations', 'incomplete']
+            max_nodes_per_rule: Keep at most this many nodes per rule
+            max_html_length: Truncate node html snippets to this many characters
+        """
+        super().__init__(load_profile, result_types, max_nodes_per_rule, max_html_length)
+        self.browser_ws_url = browser_ws_url
+        self.chrome_path = chrome_path
+        self.page_timeout = page_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._connection: Optional[DevToolsConnection] = None
+        self._process = None
+        self._profile_dir = None
+        self._stderr_drain = None
+        self._start_lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        """Connect to Chrome, launching it first if no endpoint was given"""
+        async with self._start_lock:
+            if self._connection is not None:
+                return
+            try:
+                ws_url = self.browser_ws_url or await self._launch_chrome()
+                self._connection = await DevToolsConnection.connect(ws_url)
+            except BaseException:
+                # Don't leave a launched Chrome or its profile directory behind
+                await self._stop_browser()
+                raise
+
+    async def close(self):
+        """Disconnect and stop the browser if this checker launched it"""
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+        await self._stop_browser()
+
+    async def _stop_browser(self):
+        """Stop the Chrome launched by this checker and remove its profile directory"""
+        if self._process is not None:
+            if self._process.returncode is None:
+                self._process.terminate()
+                await self._process.wait()
+            self._process = None
+        if self._stderr_drain is not None:
+            self._stderr_drain.cancel()
+            self._stderr_drain = None
+        if self._profile_dir is not None:
+            self._profile_dir.cleanup()
+            self._profile_dir = None
+
+    async def run(self, url: str, wcag_levels: list = None) -> Dict[str, Any]:
+        """
+        Run axe-core accessibility analysis on the given URL
+
+        Args:
+            url: The URL to analyze
+            wcag_levels: List of WCAG levels to analyze
+
+        Returns:
+            Dictionary containing axe-core results
+        """
+        await self.start()
+        async with self._semaphore:
+            try:
+                axe_results = await asyncio.wait_for(self._scan_in_new_tab(url, wcag_levels), self.page_timeout)
+            except asyncio.TimeoutError:
+                raise Exception(f"Error during axe-core analysis: timed out after {self.page_timeout} seconds")
+            except Exception as e:
+                raise Exception(f"Error during axe-core analysis: {str(e)}")
+
+        if axe_results is None:
+            raise Exception("axe.run did not return any results (None). JavaScript execution may have failed.")
+        return self._process_axe_results(axe_results)
+
+    async def run_many(self, urls: List[str], wcag_levels: list = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Scan several URLs concurrently, bounded by max_concurrency
+
+        Yields:
+            Dictionaries with 'url', 'automated_results' and 'error', in completion order
+        """
+        async def scan(url):
+            try:
+                return {'url': url, 'automated_results': await self.run(url, wcag_levels), 'error': None}
+            except Exception as e:
+                return {'url': url, 'automated_results': None, 'error': str(e)}
+
+        tasks = [asyncio.create_task(scan(url)) for url in urls]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _scan_in_new_tab(self, url: str, wcag_levels: list) -> Dict[str, Any]:
+        """Open a tab, load the URL with axe pre-registered, run axe and close the tab"""
+        connection = self._connection
+        target = await connection.send('Target.createTarget', {'url': 'about:blank'})
+        target_id = target['targetId']
+        block_listener = None
+        try:
+            attached = await connection.send('Target.attachToTarget', {'targetId': target_id, 'flatten': True})
+            session_id = attached['sessionId']
+
+            loaded = asyncio.get_running_loop().create_future()
+            # 'eager' and 'none' only need the DOM, not every subresource
+            load_event = 'load' if self.load_profile.page_load_strategy == 'normal' else 'DOMContentLoaded'
+            # Loader ids whose load_event fired; the initial about:blank has its own loader
+            fired_loaders = set()
+            loader_id = None
+
+            def on_event(message):
+                if message.get('sessionId') != session_id or message.get('method') != 'Page.lifecycleEvent':
+                    return
+                params = message.get('params', {})
+                if params.get('name') != load_event:
+                    return
+                fired_loaders.add(params.get('loaderId'))
+                if loader_id is not None and params.get('loaderId') == loader_id and not loaded.done():
+                    loaded.set_result(True)
+
+            connection.add_listener(on_event)
+            try:
+                await connection.send('Page.enable', session_id=session_id)
+                await connection.send('Page.setLifecycleEventsEnabled', {'enabled': True}, session_id=session_id)
+                await connection.send('Page.addScriptToEvaluateOnNewDocument', {'source': load_axe_script()},
+                                      session_id=session_id)
+                if self.load_profile.network_idle_ms:
+                    await connection.send('Page.addScriptToEvaluateOnNewDocument', {'source': NETWORK_TRACKER_SCRIPT},
+                                          session_id=session_id)
+                if self.load_profile.blocked_resource_types():
+                    block_listener = await self._block_resource_types(session_id)
+                blocked_urls = self.load_profile.blocked_urls(by_resource_type=True)
+                if blocked_urls:
+                    await connection.send('Network.enable', session_id=session_id)
+                    await connection.send('Network.setBlockedURLs', {'urls': blocked_urls}, session_id=session_id)
+                navigation = await connection.send('Page.navigate', {'url': url}, session_id=session_id)
+                if navigation.get('errorText'):
+                    raise Exception(f"Failed to load {url}: {navigation['errorText']}")
+                loader_id = navigation.get('loaderId')
+                # No loaderId means a same-document navigation: nothing new to wait for
+                if loader_id is not None and loader_id not in fired_loaders:
+                    await loaded
+            finally:
+                connection.remove_listener(on_event)
+
+            if self.load_profile.network_idle_ms:
+                await self._wait_for_network_idle(session_id)
+            await self._ensure_axe(session_id)
+            return await self._evaluate(
+                f"axe.run(document, {json.dumps(self._build_axe_options(wcag_levels))})"
+                f".then(results => ({TRIM_AXE_RESULTS_FUNCTION})(results, {json.dumps(self._result_limits())}))"
+                ".catch(err => ({error: err.toString()}))",
+                session_id
+            )
+        finally:
+            if block_listener is not None:
+                connection.remove_listener(block_listener)
+            try:
+                await connection.send('Target.closeTarget', {'targetId': target_id})
+            except Exception:
+                pass
+
+    async def _block_resource_types(self, session_id: str) -> Callable[[Dict[str, Any]], None]:
+        """
+        Fail the tab's requests of the load profile's blocked resource types
+
+        Unlike URL patterns this can't hit a page whose host happens to look
+        like a file extension. Returns the listener to remove when the tab closes.
+        """
+        connection = self._connection
+        # Answers in flight; kept referenced until they are sent
+        pending = set()
+
+        def on_paused(message):
+            if message.get('sessionId') != session_id or message.get('method') != 'Fetch.requestPaused':
+                return
+            task = asyncio.create_task(connection.send('Fetch.failRequest', {
+                'requestId': message['params']['requestId'],
+                'errorReason': 'BlockedByClient'
+            }, session_id=session_id))
+            pending.add(task)
+            # The tab may close before the answer arrives
+            task.add_done_callback(lambda done: (pending.discard(done), done.cancelled() or done.exception()))
+
+        connection.add_listener(on_paused)
+        try:
+            await connection.send('Fetch.enable', {
+                'patterns': [{'resourceType': resource_type} for resource_type in self.load_profile.blocked_resource_types()]
+            }, session_id=session_id)
+        except Exception:
+            connection.remove_listener(on_paused)
+            raise
+        return on_paused
+
+    async def _wait_for_network_idle(self, session_id: str):
+        """Wait until the page has had no network activity for network_idle_ms"""
+        expression = f"(function() {{ {NETWORK_IDLE_SCRIPT} }}).apply(null, [{json.dumps(self.load_profile.network_idle_ms)}])"
+        deadline = time.monotonic() + self.load_profile.max_wait
+        while not await self._evaluate(expression, session_id):
+            if time.monotonic() >= deadline:
+                # Long-polling or streaming pages never go idle; scan what has loaded
+                print(f"Network did not go idle within {self.load_profile.max_wait} seconds; continuing")
+                return
+            await asyncio.sleep(TAB_POLL_INTERVAL)
+
+    async def _ensure_axe(self, session_id: str):
+        """Inject axe-core directly if the page replaced or blocked the registered copy"""
+        if await self._evaluate("typeof axe !== 'undefined'", session_id):
+            return
+        await self._evaluate(load_axe_script(), session_id)
+
+    async def _evaluate(self, expression: str, session_id: str) -> Any:
+        """Evaluate an expression in the page, awaiting promises, and return its value"""
+        response = await self._connection.send('Runtime.evaluate', {
+            'expression': expression,
+            'awaitPromise': True,
+            'returnByValue': True
+        }, session_id=session_id)
+        if 'exceptionDetails' in response:
+            details = response['exceptionDetails']
+            raise Exception(details.get('exception', {}).get('description') or details.get('text', 'JavaScript error'))
+        return response.get('result', {}).get('value')
+
+    async def _launch_chrome(self) -> str:
+        """Start headless Chrome with remote debugging and return its browser websocket URL"""
+        chrome_path = self.chrome_path or next(filter(None, map(shutil.which, CHROME_BINARIES)), None)
+        if not chrome_path:
+            raise Exception("Failed to setup Chrome: no Chrome/Chromium executable found")
+
+        self._profile_dir = tempfile.TemporaryDirectory(prefix='a11y-chrome-')
+        args = build_chrome_options().arguments + [
+            '--remote-debugging-port=0',
+            f'--user-data-dir={self._profile_dir.name}',
+            'about:blank'
+        ]
+        self._process = await asyncio.create_subprocess_exec(
+            chrome_path, *args,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+
+        while True:
+            line = await self._process.stderr.readline()
+            if not line:
+                raise Exception("Failed to setup Chrome: browser exited before DevTools was ready")
+            match = DEVTOOLS_URL_PATTERN.search(line.decode('utf-8', 'replace'))
+            if match:
+                break
+
+        # Keep reading stderr so a chatty browser never blocks on a full pipe
+        self._stderr_drain = asyncio.create_task(self._drain(self._process.stderr))
+        return match.group(1)
+
+    @staticmethod
+    async def _drain(stream):
+        while await stream.readline():
+            pass
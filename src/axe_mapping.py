@@ -0,0 +1,135 @@
+"""
+Mapping between axe-core rule tags and WCAG_CRITERIA ids
+
+axe tags every rule with the success criteria it tests (wcag111 -> 1.1.1,
+wcag1412 -> 1.4.12). This lets the AI evaluation reuse automated results:
+criteria with confirmed axe violations are decided without an AI call, and the
+nodes axe flagged are sent as focused context for the remaining criteria.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+# wcag<principle><guideline><criterion>; level tags such as wcag2a/wcag21aa don't match
+AXE_CRITERIA_TAG_PATTERN = re.compile(r'^wcag(\d)(\d)(\d+)$')
+
+# Rules with these tags may report false positives, so they never decide a criteria
+UNRELIABLE_RULE_TAGS = {'experimental'}
+
+# axe node/rule impact -> evaluation priority
+IMPACT_PRIORITY = {
+    'critical': 'critical',
+    'serious': 'high',
+    'moderate': 'medium',
+    'minor': 'low'
+}
+
+# Flagged nodes included per criteria in a prompt
+MAX_FOCUSED_NODES = 10
+
+
+def criteria_id_for_tag(tag: str) -> Optional[str]:
+    """'wcag111' -> '1.1.1', or None for tags that don't name a success criteria"""
+    match = AXE_CRITERIA_TAG_PATTERN.match(tag)
+    if not match:
+        return None
+    return '.'.join(match.groups())
+
+
+def criteria_ids_for_rule(rule: Dict[str, Any]) -> List[str]:
+    """Success criteria ids an axe rule result is tagged with"""
+    return [criteria_id for criteria_id in map(criteria_id_for_tag, rule.get('tags', [])) if criteria_id]
+
+
+def map_axe_results(automated_results: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+    """
+    Group processed axe results by WCAG criteria
+
+    Args:
+        automated_results: Output of AccessibilityChecker.run_axe_core_analysis
+
+    Returns:
+        criteria id -> {'violations': [...], 'incomplete': [...], 'passes': [...]} of axe rule results
+    """
+    findings = {}
+    if not automated_results:
+        return findings
+    for category in ('violations', 'incomplete', 'passes'):
+        for rule in automated_results.get(category, []):
+            for criteria_id in criteria_ids_for_rule(rule):
+                criteria_findings = findings.setdefault(criteria_id, {'violations': [], 'incomplete': [], 'passes': []})
+                criteria_findings[category].append(rule)
+    return findings
+
+
+def axe_decided_result(criteria_id: str, criteria_data: Dict[str, Any],
+                       findings: Optional[Dict[str, List[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+    """
+    Evaluation result for a criteria that axe-core already failed
+
+    Only confirmed violations of reliable rules decide a criteria; axe passes
+    never do, because a passing rule doesn't prove e.g. that alt text is meaningful.
+
+    Returns:
+        A 'fail' result in the shape of an AI evaluation, or None if the AI should evaluate the criteria
+    """
+    if not findings:
+        return None
+    violations = [
+        rule for rule in findings.get('violations', [])
+        if not UNRELIABLE_RULE_TAGS.intersection(rule.get('tags', []))
+    ]
+    if not violations:
+        return None
+
+    issues = []
+    recommendations = []
+    impacts = []
+    for rule in violations:
+        issues.append(f"{rule.get('help') or rule.get('id')} ({len(rule.get('nodes', []))} element(s), axe rule '{rule.get('id')}')")
+        if rule.get('helpUrl'):
+            recommendations.append(f"{rule.get('description') or rule.get('help')} See {rule['helpUrl']}")
+        impacts.append(rule.get('impact'))
+
+    priority = next((IMPACT_PRIORITY[impact] for impact in IMPACT_PRIORITY if impact in impacts), 'medium')
+    return {
+        'status': 'fail',
+        'confidence': 1.0,
+        'assessment': f"Automated testing found {len(violations)} confirmed violation(s) of this criteria.",
+        'issues': issues,
+        'recommendations': recommendations,
+        'priority': priority,
+        'level': criteria_data['level'],
+        'title': criteria_data['title'],
+        'criteria_id': criteria_id,
+        'source': 'axe-core'
+    }
+
+
+def format_axe_findings(findings: Optional[Dict[str, List[Dict[str, Any]]]], max_nodes: int = MAX_FOCUSED_NODES) -> str:
+    """Prompt section with the nodes axe flagged for a criteria ('' when there are none)"""
+    if not findings:
+        return ''
+    nodes = []
+    for category in ('violations', 'incomplete'):
+        for rule in findings.get(category, []):
+            for node in rule.get('nodes', []):
+                nodes.append({
+                    'axe_result': 'violation' if category == 'violations' else 'needs review',
+                    'rule': rule.get('id'),
+                    'help': rule.get('help'),
+                    'target': node.get('target', []),
+                    'html': node.get('html', '')
+                })
+    passed_rules = [rule.get('id') for rule in findings.get('passes', [])]
+    if not nodes and not passed_rules:
+        return ''
+
+    section = "\n**Automated Test Findings (axe-core):**\n"
+    if nodes:
+        section += f"Elements flagged by automated testing (first {min(len(nodes), max_nodes)} of {len(nodes)}):\n"
+        section += json.dumps(nodes[:max_nodes], indent=2) + "\n"
+    if passed_rules:
+        section += f"Automated rules passed: {', '.join(passed_rules)}\n"
+    return section
@@ -0,0 +1,324 @@
+"""
+Offline AI evaluation through the provider batch APIs
+
+For scheduled audits of many pages latency doesn't matter, while the batch
+APIs of OpenAI and Anthropic process requests at a lower price and outside the
+online rate limits. BatchAIEvaluator writes every criteria prompt of a run to
+JSONL files, submits them, polls until the provider has finished and parses
+the responses into the same manual_results shape as
+AIEvaluator.evaluate_manual_criteria.
+
+Run state is kept in a JSON manifest next to the batch files, so a nightly job
+can submit, exit, and collect the results in a later process.
+
+To run against a local stand-in (see src.llm_stub_server), create the
+evaluator with provider_options={'base_url': ...} or set OPENAI_BASE_URL.
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from src.ai_evaluator import AIEvaluator
+from src.wcag_criteria import WCAG_CRITERIA
+
+# Same response allowance as an online single-criteria evaluation
+BATCH_MAX_TOKENS = 2000
+
+# Provider limits are 50,000 (OpenAI) and 100,000 (Anthropic) requests per batch
+MAX_REQUESTS_PER_BATCH = 50000
+
+# Provider limits are 200 MB (OpenAI input file) and 256 MB (Anthropic batch) per batch
+MAX_BATCH_FILE_BYTES = 190 * 1024 * 1024
+
+OPENAI_BATCH_ENDPOINT = "/v1/chat/completions"
+
+BATCH_PROVIDERS = {'openai', 'anthropic'}
+
+# Provider status -> finished?
+OPENAI_FINAL_STATUSES = {'completed', 'failed', 'expired', 'cancelled'}
+ANTHROPIC_FINAL_STATUSES = {'ended'}
+
+
+class BatchAIEvaluator:
+    """
+    Evaluates manual criteria for many pages with one or more provider batch jobs
+    """
+
+    def __init__(self, evaluator: AIEvaluator, work_dir: str = ".cache/batches", poll_interval: float = 60.0):
+        """
+        Args:
+            evaluator: Provides the provider client, prompts, cache and response parsing
+            work_dir: Directory for batch JSONL files and run manifests
+            poll_interval: Seconds between status checks while waiting
+        """
+        self.evaluator = evaluator
+        self.work_dir = work_dir
+        self.poll_interval = poll_interval
+        os.makedirs(work_dir, exist_ok=True)
+
+    def run(self, pages: List[Dict[str, Any]], wcag_levels: List[str], wcag_version: str = "2.1",
+            timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Prepare, submit, wait for and collect a batch run
+
+        Args:
+            pages: Dictionaries with 'page_content' and optionally 'automated_results'
+            wcag_levels: List of WCAG levels to evaluate (A, AA, AAA)
+            wcag_version: WCAG version to use (2.0, 2.1, 2.2)
+            timeout: Maximum seconds to wait for the provider (None waits indefinitely)
+
+        Returns:
+            manual_results dictionaries in the order of pages
+        """
+        manifest_path = self.prepare(pages, wcag_levels, wcag_version)
+        self.submit(manifest_path)
+        self.wait(manifest_path, timeout=timeout)
+        return self.collect(manifest_path)
+
+    def prepare(self, pages: List[Dict[str, Any]], wcag_levels: List[str], wcag_version: str = "2.1",
+                name: Optional[str] = None) -> str:
+        """
+        Write the batch request files and the run manifest
+
+        Criteria decided locally (not applicable, failed by axe-core or found in
+        the evaluation cache) are stored in the manifest and never submitted.
+
+        Returns:
+            Path of the manifest
+        """
+        evaluator = self.evaluator
+        if evaluator.provider not in BATCH_PROVIDERS:
+            raise ValueError(f"Batch evaluation is not supported for provider '{evaluator.provider}'")
+        name = name or datetime.now().strftime('run-%Y%m%d-%H%M%S-%f')
+        requests = []
+        manifest = {
+            'name': name,
+            'provider': evaluator.provider,
+            'model': evaluator.model,
+            'created_at': datetime.now().isoformat(),
+            'pages': [],
+            'batches': []
+        }
+
+        for page_index, page in enumerate(pages):
+            criteria_order, decided, page_content, criteria_to_evaluate = evaluator._plan_evaluation(
+                page['page_content'], wcag_levels, wcag_version, page.get('automated_results')
+            )
+            page_entry = {
+                'url': page['page_content'].get('url', ''),
+                'criteria_order': criteria_order,
+                'decided': decided,
+                'requests': {}
+            }
+            for criteria_id, criteria_data in criteria_to_evaluate.items():
+                prefix, suffix = evaluator._create_prompt_parts(criteria_id, criteria_data, page_content)
+                cache_key = evaluator._cache_key(criteria_id, prefix + suffix)
+                if cache_key is not None:
+                    cached = evaluator.cache.get(cache_key)
+                    if cached is not None:
+                        decided[criteria_id] = cached
+                        continue
+                # Anthropic only allows [A-Za-z0-9_-] in custom ids
+                custom_id = f"p{page_index}-{criteria_id.replace('.', '_')}"
+                page_entry['requests'][custom_id] = {'criteria_id': criteria_id, 'cache_key': cache_key}
+                requests.append(self._batch_line(custom_id, prefix, suffix))
+            manifest['pages'].append(page_entry)
+
+        self._write_batch_files(name, requests, manifest)
+
+        manifest_path = os.path.join(self.work_dir, f"{name}.manifest.json")
+        self._save_manifest(manifest_path, manifest)
+        print(f"Prepared {len(requests)} batch requests for {len(pages)} pages in {len(manifest['batches'])} batch file(s)")
+        return manifest_path
+
+    def _write_batch_files(self, name: str, requests: List[Dict[str, Any]], manifest: Dict[str, Any]):
+        """
+        Write the requests to as many JSONL files as the provider limits need
+
+        A new part starts when the next line would exceed MAX_REQUESTS_PER_BATCH
+        requests or MAX_BATCH_FILE_BYTES bytes.
+        """
+        f = None
+        count = 0
+        size = 0
+        try:
+            for request in requests:
+                line = (json.dumps(request, ensure_ascii=False) + "\n").encode('utf-8')
+                if f is None or count >= MAX_REQUESTS_PER_BATCH or size + len(line) > MAX_BATCH_FILE_BYTES:
+                    if f is not None:
+                        f.close()
+                    jsonl_path = os.path.join(self.work_dir, f"{name}.part{len(manifest['batches'])}.jsonl")
+                    f = open(jsonl_path, 'wb')
+                    manifest['batches'].append({'jsonl_path': jsonl_path, 'batch_id': None, 'status': 'prepared'})
+                    count = 0
+                    size = 0
+                f.write(line)
+                count += 1
+                size += len(line)
+        finally:
+            if f is not None:
+                f.close()
+
+    def submit(self, manifest_path: str) -> List[str]:
+        """Upload and start every batch of a run that hasn't been submitted yet; returns the batch ids"""
+        manifest = self._load_manifest(manifest_path)
+        for batch in manifest['batches']:
+            if batch['batch_id'] is None:
+                try:
+                    batch['batch_id'] = self._submit_batch(batch['jsonl_path'])
+                    batch['status'] = 'submitted'
+                finally:
+                    # Keep the ids of batches already submitted even if a later one fails
+                    self._save_manifest(manifest_path, manifest)
+        return [batch['batch_id'] for batch in manifest['batches']]
+
+    def poll(self, manifest_path: str) -> bool:
+        """Refresh the status of every batch; returns True once all of them have finished"""
+        manifest = self._load_manifest(manifest_path)
+        finished = True
+        for batch in manifest['batches']:
+            if batch['batch_id'] is None:
+                raise Exception(f"Batch file {batch['jsonl_path']} has not been submitted")
+            if not batch.get('finished'):
+                batch['status'], batch['finished'] = self._batch_status(batch['batch_id'])
+            finished = finished and batch['finished']
+        self._save_manifest(manifest_path, manifest)
+        return finished
+
+    def wait(self, manifest_path: str, timeout: Optional[float] = None):
+        """Poll until every batch of the run has finished"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.poll(manifest_path):
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Batch run {manifest_path} did not finish within {timeout} seconds")
+            time.sleep(self.poll_interval)
+
+    def collect(self, manifest_path: str) -> List[Dict[str, Any]]:
+        """
+        Download the batch output and build manual_results per page
+
+        Requests without a usable response get an 'error' result, like a failed
+        online evaluation.
+        """
+        manifest = self._load_manifest(manifest_path)
+        evaluator = self.evaluator
+        evaluator.reset_usage()
+
+        responses = {}
+        for batch in manifest['batches']:
+            responses.update(self._batch_responses(batch['batch_id']))
+
+        all_results = []
+        for page_entry in manifest['pages']:
+            results = dict(page_entry['decided'])
+            for custom_id, request in page_entry['requests'].items():
+                criteria_id = request['criteria_id']
+                criteria_data = WCAG_CRITERIA[criteria_id]
+                text, error = responses.get(custom_id, (None, "No result returned by the batch"))
+                if error is not None:
+                    results[criteria_id] = {
+                        'status': 'error',
+                        'error': error,
+                        'level': criteria_data['level'],
+                        'title': criteria_data['title']
+                    }
+                    continue
+                evaluation = evaluator._parse_ai_response(text, criteria_data)
+                evaluator._store_in_cache(request['cache_key'], evaluation)
+                results[criteria_id] = evaluation
+            all_results.append({criteria_id: results[criteria_id] for criteria_id in page_entry['criteria_order']})
+
+        print(f"Batch evaluation usage: {evaluator.usage['calls']} responses, {evaluator.usage['input_tokens']} input tokens, "
+              f"{evaluator.usage['output_tokens']} output tokens")
+        return all_results
+
+    def _batch_line(self, custom_id: str, prefix: str, suffix: str) -> Dict[str, Any]:
+        """One request in the provider's batch file format"""
+        llm = self.evaluator.llm
+        if self.evaluator.provider == "openai":
+            return {
+                'custom_id': custom_id,
+                'method': 'POST',
+                'url': OPENAI_BATCH_ENDPOINT,
+                'body': llm.request_params(prefix, suffix, BATCH_MAX_TOKENS, self.evaluator.temperature)
+            }
+        return {'custom_id': custom_id, 'params': llm.request_params(prefix, suffix, BATCH_MAX_TOKENS, self.evaluator.temperature)}
+
+    def _submit_batch(self, jsonl_path: str) -> str:
+        if self.evaluator.provider == "openai":
+            client = self.evaluator.llm.client
+            with open(jsonl_path, 'rb') as f:
+                input_file = client.files.create(file=f, purpose='batch')
+            batch = client.batches.create(
+                input_file_id=input_file.id,
+                endpoint=OPENAI_BATCH_ENDPOINT,
+                completion_window='24h'
+            )
+            return batch.id
+
+        # The Message Batches API takes the requests in the body rather than as an uploaded file
+        with open(jsonl_path, 'r', encoding='utf-8') as f:
+            requests = [json.loads(line) for line in f if line.strip()]
+        batch = self.evaluator.llm.client.messages.batches.create(requests=requests)
+        return batch.id
+
+    def _batch_status(self, batch_id: str) -> Tuple[str, bool]:
+        """(provider status, finished?) of one batch"""
+        if self.evaluator.provider == "openai":
+            status = self.evaluator.llm.client.batches.retrieve(batch_id).status
+            return status, status in OPENAI_FINAL_STATUSES
+        status = self.evaluator.llm.client.messages.batches.retrieve(batch_id).processing_status
+        return status, status in ANTHROPIC_FINAL_STATUSES
+
+    def _batch_responses(self, batch_id: str) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """custom_id -> (response text, error message) for one finished batch"""
+        evaluator = self.evaluator
+        llm = evaluator.llm
+        responses = {}
+
+        if evaluator.provider == "anthropic":
+            for entry in llm.client.messages.batches.results(batch_id):
+                if entry.result.type == 'succeeded':
+                    response = llm.parse_message(entry.result.message)
+                    evaluator._record_response(response)
+                    responses[entry.custom_id] = (response.text, None)
+                else:
+                    error = getattr(entry.result, 'error', None)
+                    responses[entry.custom_id] = (None, f"Batch request {entry.result.type}: {error}")
+            return responses
+
+        client = llm.client
+        batch = client.batches.retrieve(batch_id)
+        # Expired or cancelled batches still return the requests that completed
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                response = entry.get('response') or {}
+                body = response.get('body') or {}
+                if entry.get('error') or response.get('status_code') != 200:
+                    error = entry.get('error') or body.get('error') or f"HTTP {response.get('status_code')}"
+                    responses[entry['custom_id']] = (None, f"Batch request failed: {error}")
+                    continue
+                response = llm.parse_completion(body)
+                evaluator._record_response(response)
+                responses[entry['custom_id']] = (response.text, None)
+        return responses
+
+    @staticmethod
+    def _load_manifest(manifest_path: str) -> Dict[str, Any]:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _save_manifest(manifest_path: str, manifest: Dict[str, Any]):
+        # Write atomically so an interrupted job never leaves a truncated manifest
+        temp_path = manifest_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, manifest_path)
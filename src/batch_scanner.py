@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Batch accessibility scanning across worker processes
+
+Each worker process owns one long-lived AccessibilityChecker backed by its own
+warm Chrome driver, so a large URL list is spread over all CPU cores while every
+browser is started only once per worker.
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import util
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from src.accessibility_checker import AccessibilityChecker
+from src.driver_pool import DriverPool
+
+# Set up once per worker process by _init_worker
+_worker_checker: Optional[AccessibilityChecker] = None
+
+
+def _init_worker(driver_max_uses: int):
+    """Create this worker's checker and make sure its browser is quit on exit"""
+    global _worker_checker
+    pool = DriverPool(size=1, max_uses=driver_max_uses)
+    # atexit handlers don't run in forked workers; multiprocessing finalizers do
+    util.Finalize(pool, pool.close, exitpriority=10)
+    _worker_checker = AccessibilityChecker(driver_pool=pool)
+
+
+def _scan_chunk(urls: List[str], wcag_levels: Optional[List[str]], tabs_per_worker: int) -> List[Dict[str, Any]]:
+    """Scan one shard of URLs inside a worker process"""
+    if tabs_per_worker > 1:
+        try:
+            return list(_worker_checker.scan_many(urls, wcag_levels=wcag_levels, concurrency=tabs_per_worker))
+        except Exception as e:
+            return [{'url': url, 'automated_results': None, 'error': str(e)} for url in urls]
+
+    results = []
+    for url in urls:
+        try:
+            automated_results = _worker_checker.run_axe_core_analysis(url, wcag_levels=wcag_levels)
+            results.append({'url': url, 'automated_results': automated_results, 'error': None})
+        except Exception as e:
+            results.append({'url': url, 'automated_results': None, 'error': str(e)})
+    return results
+
+
+class BatchScanner:
+    """
+    Shards a URL list across a ProcessPoolExecutor of scanning workers
+    """
+
+    def __init__(self, workers: Optional[int] = None, tabs_per_worker: int = 1,
+                 chunk_size: Optional[int] = None, driver_max_uses: int = 50):
+        """
+        Args:
+            workers: Number of worker processes (defaults to the CPU count)
+            tabs_per_worker: Tabs each worker scans concurrently via scan_many
+            chunk_size: URLs sent to a worker per task (defaults to tabs_per_worker)
+            driver_max_uses: Scans before a worker's Chrome is recycled
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.tabs_per_worker = max(1, tabs_per_worker)
+        self.chunk_size = chunk_size or self.tabs_per_worker
+        self.driver_max_uses = driver_max_uses
+
+    def scan(self, urls: Iterable[str], wcag_levels: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Scan all URLs, yielding results as soon as each shard completes
+
+        Args:
+            urls: The URLs to analyze
+            wcag_levels: List of WCAG levels to analyze
+
+        Yields:
+            Dictionaries with 'url', 'automated_results' and 'error', in completion order
+        """
+        chunks = self._chunk(urls)
+        # Keep a bounded number of shards queued so huge lists aren't materialised as futures
+        max_in_flight = self.workers * 2
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.driver_max_uses,)) as executor:
+            in_flight = {}
+
+            def submit_next() -> bool:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    return False
+                future = executor.submit(_scan_chunk, chunk, wcag_levels, self.tabs_per_worker)
+                in_flight[future] = chunk
+                return True
+
+            while len(in_flight) < max_in_flight and submit_next():
+                pass
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = in_flight.pop(future)
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        # The worker died (e.g. BrokenProcessPool); report the whole shard
+                        results = [{'url': url, 'automated_results': None, 'error': f"Worker failed: {e}"}
+                                   for url in chunk]
+                    yield from results
+                    submit_next()
+
+    def _chunk(self, urls: Iterable[str]) -> Iterator[List[str]]:
+        """Split the URL stream into shards of chunk_size"""
+        chunk = []
+        for url in urls:
+            chunk.append(url)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run axe-core scans for a list of URLs across worker processes")
+    parser.add_argument('url_file', help="File with one URL per line ('-' for stdin)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--tabs', type=int, default=1, help="Concurrent tabs per worker")
+    parser.add_argument('--levels', default="A,AA", help="Comma-separated WCAG levels")
+    args = parser.parse_args()
+
+    source = sys.stdin if args.url_file == '-' else open(args.url_file, 'r', encoding='utf-8')
+    with source:
+        urls = [line.strip() for line in source if line.strip()]
+
+    scanner = BatchScanner(workers=args.workers, tabs_per_worker=args.tabs)
+    # One JSON object per line so results can be consumed while the run is in progress
+    for result in scanner.scan(urls, wcag_levels=args.levels.split(',')):
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Set
+from urllib.parse import urlsplit
+from urllib3.exceptions import HTTPError as DriverConnectionError
+from selenium import webdriver
+from selenium.common.exceptions import (InvalidSessionIdException, NoSuchWindowException,
+                                        SessionNotCreatedException, WebDriverException)
+from selenium.webdriver.chrome.options import Options
+from src.load_profile import LoadProfile
+
+ACQUIRE_POLL_INTERVAL = 0.5
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Clears web storage of the current origin before leaving the page; only used
+# when DevTools is unavailable (about:blank has no storage of its own, so this must run first)
+RESET_STORAGE_SCRIPT = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+"""
+
+# WebDriver errors meaning the browser or its session is gone
+BROWSER_FAILURE_EXCEPTIONS = (InvalidSessionIdException, NoSuchWindowException, SessionNotCreatedException)
+
+# Messages of generic WebDriverExceptions raised when Chrome itself failed; other generic
+# errors (net::ERR_NAME_NOT_RESOLVED...) come from the page and leave the browser usable
+BROWSER_FAILURE_MESSAGES = (
+    'chrome not reachable',
+    'cannot connect to chrome',
+    'disconnected',
+    'session deleted',
+    'tab crashed',
+    'page crash',
+    'target window already closed'
+)
+
+
+def tab_state(driver: webdriver.Chrome, handle: str) -> Dict[str, Any]:
+    """
+    DevTools setup already applied to one tab of a driver (axe registration, load profile)
+
+    Kept on the driver object itself, so it goes away with the driver and a
+    pooled driver carries it from one scan to the next.
+    """
+    tabs = getattr(driver, '_a11y_tab_state', None)
+    if tabs is None:
+        tabs = {}
+        driver._a11y_tab_state = tabs
+    return tabs.setdefault(handle, {})
+
+
+def forget_tab(driver: webdriver.Chrome, handle: str):
+    """Drop the recorded setup of a tab that was closed"""
+    getattr(driver, '_a11y_tab_state', {}).pop(handle, None)
+
+
+def is_browser_failure(error: Exception) -> bool:
+    """
+    Whether an error means the driver is broken and must not be reused
+
+    Timeouts, page script errors, missing elements and invalid URLs are problems
+    with the page being scanned; a healthy pooled Chrome is kept for those.
+    """
+    if isinstance(error, BROWSER_FAILURE_EXCEPTIONS):
+        return True
+    if isinstance(error, (ConnectionError, DriverConnectionError)):
+        # chromedriver itself stopped answering
+        return True
+    if type(error) is WebDriverException:
+        message = (error.msg or '').lower()
+        return any(marker in message for marker in BROWSER_FAILURE_MESSAGES)
+    return False
+
+
+def build_chrome_options(load_profile: Optional[LoadProfile] = None) -> Options:
+    """Build the headless Chrome options used for every scan"""
+    chrome_options = Options()
+    if load_profile is not None:
+        chrome_options.page_load_strategy = load_profile.page_load_strategy
+    chrome_options.add_argument('--headless')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--window-size=1920,1080')
+    chrome_options.add_argument(f'--user-agent={USER_AGENT}')
+    return chrome_options
+
+
+def create_chrome_driver(load_profile: Optional[LoadProfile] = None) -> webdriver.Chrome:
+    """Launch a new headless Chrome WebDriver"""
+    return webdriver.Chrome(options=build_chrome_options(load_profile))
+
+
+class DriverPool:
+    """
+    Keeps a set of headless Chrome drivers warm so scans don't pay browser start-up.
+
+    Drivers are handed out with acquire() and must be given back with release(),
+    which resets the browser (cookies, storage, extra tabs) and navigates to
+    about:blank. A driver is recycled after max_uses scans or as soon as it stops
+    responding.
+    """
+
+    def __init__(self, size: int = 2, max_uses: int = 50,
+                 driver_factory: Optional[Callable[[], webdriver.Chrome]] = None,
+                 load_profile: Optional[LoadProfile] = None):
+        """
+        Args:
+            size: Maximum number of Chrome instances kept by the pool
+            max_uses: Scans after which a driver is quit and replaced
+            driver_factory: Callable launching a new driver (headless Chrome by default)
+            load_profile: Load profile whose pageLoadStrategy new drivers are started with
+        """
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.size = size
+        self.max_uses = max_uses
+        self.driver_factory = driver_factory or partial(create_chrome_driver, load_profile)
+
+        self._idle = queue.LifoQueue()
+        self._uses: Dict[int, int] = {}
+        self._created = 0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def warm(self):
+        """Start drivers until the pool holds `size` instances"""
+        while True:
+            with self._lock:
+                if self._closed or self._created >= self.size:
+                    return
+                self._created += 1
+            try:
+                driver = self.driver_factory()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+            self._uses[id(driver)] = 0
+            self._idle.put(driver)
+
+    def acquire(self, timeout: Optional[float] = None) -> webdriver.Chrome:
+        """
+        Take a driver from the pool, launching one if the pool is not yet full
+
+        Args:
+            timeout: Seconds to wait for a free driver (None waits forever)
+
+        Returns:
+            A ready-to-use WebDriver sitting on about:blank
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            if self._closed:
+                raise RuntimeError("Driver pool is closed")
+
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+
+            if can_create:
+                try:
+                    driver = self.driver_factory()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+                self._uses[id(driver)] = 0
+                return driver
+
+            # Wake up periodically so a slot freed by a retired driver is noticed
+            wait = ACQUIRE_POLL_INTERVAL
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+                if wait <= 0:
+                    raise TimeoutError(f"No driver became available within {timeout} seconds")
+            try:
+                return self._idle.get(timeout=wait)
+            except queue.Empty:
+                continue
+
+    def release(self, driver: webdriver.Chrome, discard: bool = False):
+        """
+        Return a driver to the pool
+
+        Args:
+            driver: Driver previously obtained from acquire()
+            discard: Quit the driver instead of reusing it (e.g. after a crash)
+        """
+        uses = self._uses.get(id(driver), 0) + 1
+        self._uses[id(driver)] = uses
+
+        if discard or self._closed or uses >= self.max_uses or not self._reset_driver(driver):
+            self._retire(driver)
+            return
+
+        self._idle.put(driver)
+
+    @contextmanager
+    def driver(self, timeout: Optional[float] = None):
+        """Context manager form of acquire()/release()"""
+        driver = self.acquire(timeout=timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def close(self):
+        """Quit all idle drivers; drivers still in use are quit on release"""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._retire(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _reset_driver(self, driver: webdriver.Chrome) -> bool:
+        """Clear per-site state so the next scan starts clean; False if the browser is unhealthy"""
+        try:
+            handles = driver.window_handles
+            origins = set()
+            for handle in reversed(handles):
+                driver.switch_to.window(handle)
+                origins |= self._visited_origins(driver)
+                if handle != handles[0]:
+                    driver.close()
+                    forget_tab(driver, handle)
+            driver.switch_to.window(handles[0])
+
+            try:
+                # Cookies of every domain, and all storage (local/session storage, IndexedDB,
+                # Cache Storage, service workers...) of every origin the tabs visited
+                driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+                for origin in origins:
+                    driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+            except WebDriverException as e:
+                if is_browser_failure(e):
+                    raise
+                # Not a Chromium driver; clear what WebDriver can reach
+                driver.execute_script(RESET_STORAGE_SCRIPT)
+                driver.delete_all_cookies()
+            driver.get('about:blank')
+            return True
+        except Exception as e:
+            print(f"Recycling unhealthy Chrome driver: {e}")
+            return False
+
+    @staticmethod
+    def _visited_origins(driver: webdriver.Chrome) -> Set[str]:
+        """Origins of every http(s) page in the current tab's history"""
+        try:
+            entries = driver.execute_cdp_cmd('Page.getNavigationHistory', {})['entries']
+        except WebDriverException as e:
+            if is_browser_failure(e):
+                raise
+            entries = [{'url': driver.current_url}]
+        origins = set()
+        for entry in entries:
+            parts = urlsplit(entry.get('url') or '')
+            if parts.scheme in ('http', 'https') and parts.hostname:
+                origins.add(f"{parts.scheme}://{parts.netloc.rsplit('@', 1)[-1].lower()}")
+        return origins
+
+    def _retire(self, driver: webdriver.Chrome):
+        """Quit a driver and free its slot in the pool"""
+        self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._lock:
+            self._created -= 1
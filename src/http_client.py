@@ -0,0 +1,244 @@
+"""
+HTTP client and streaming, size-capped download of HTML pages
+
+HTTPClient keeps pooled keep-alive connections per host, retries transient
+failures and can speak HTTP/2 with the 'http2' extra (httpx). Pages are
+requested with every compression the installed decoders support: gzip and
+deflate always, br and zstd with the 'compression' extra (or, for HTTP/2, the
+brotli and zstd extras that the 'http2' extra pulls into httpx). One client is
+shared by every AccessibilityChecker of the process, so crawling many pages of
+a site reuses a few connections.
+
+The page body is read in chunks and decoded incrementally, so a page is never
+held in memory as a whole: at most max_bytes of it are read, and parsers that
+accept input incrementally get it chunk by chunk. Pages larger than the cap
+are analyzed from their beginning and marked as truncated.
+"""
+
+import codecs
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from src.rate_limiter import RetryPolicy, parse_reset
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Accept-Encoding is left to requests/httpx: each advertises exactly the encodings it can decode
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Seconds allowed to connect and between received bytes
+DEFAULT_TIMEOUT = 30.0
+
+# Responses worth retrying when fetching a page
+RETRYABLE_PAGE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+DEFAULT_PAGE_RETRY_POLICY = RetryPolicy(max_retries=3, base_delay=0.5, max_delay=10.0)
+
+# Bytes of (decompressed) page body read at most
+DEFAULT_MAX_PAGE_BYTES = 5 * 1024 * 1024
+
+# Bytes read from the connection at a time
+CHUNK_SIZE = 64 * 1024
+
+# Bytes searched for a <meta> charset declaration, as browsers do
+CHARSET_SNIFF_BYTES = 1024
+
+CONTENT_TYPE_CHARSET_PATTERN = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+
+BOM_ENCODINGS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16')
+]
+
+
+def sniff_encoding(content_type: Optional[str], head: bytes) -> str:
+    """
+    Encoding of an HTML page from its byte order mark, Content-Type charset or
+    <meta> declaration, falling back to UTF-8
+
+    Args:
+        content_type: Content-Type response header
+        head: First bytes of the body
+    """
+    for bom, encoding in BOM_ENCODINGS:
+        if head.startswith(bom):
+            return encoding
+    candidates = []
+    match = CONTENT_TYPE_CHARSET_PATTERN.search(content_type or '')
+    if match:
+        candidates.append(match.group(1))
+    match = META_CHARSET_PATTERN.search(head[:CHARSET_SNIFF_BYTES])
+    if match:
+        candidates.append(match.group(1).decode('ascii'))
+    for candidate in candidates:
+        try:
+            return codecs.lookup(candidate).name
+        except LookupError:
+            continue
+    return 'utf-8'
+
+
+class PageStream:
+    """
+    Decoded text chunks of a streamed response body, up to max_bytes
+
+    Iterate once; afterwards bytes_read and truncated describe what was read.
+    """
+
+    def __init__(self, response: requests.Response, max_bytes: Optional[int] = DEFAULT_MAX_PAGE_BYTES,
+                 chunk_size: int = CHUNK_SIZE):
+        """
+        Args:
+            response: Response of a request made with stream=True
+            max_bytes: Stop reading after this many body bytes (None for no limit)
+            chunk_size: Bytes read from the connection at a time
+        """
+        self.response = response
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.encoding: Optional[str] = None
+        self.bytes_read = 0
+        self.truncated = False
+
+    def __iter__(self) -> Iterator[str]:
+        decoder = None
+        try:
+            for chunk in self._iter_bytes():
+                if not chunk:
+                    continue
+                if self.max_bytes is not None and self.bytes_read + len(chunk) > self.max_bytes:
+                    chunk = chunk[:self.max_bytes - self.bytes_read]
+                    self.truncated = True
+                self.bytes_read += len(chunk)
+                if decoder is None:
+                    self.encoding = sniff_encoding(self.response.headers.get('Content-Type'), chunk)
+                    decoder = codecs.getincrementaldecoder(self.encoding)(errors='replace')
+                text = decoder.decode(chunk)
+                if text:
+                    yield text
+                if self.truncated:
+                    break
+            # A character cut in half by the size cap is dropped rather than replaced
+            if decoder is not None and not self.truncated:
+                tail = decoder.decode(b'', final=True)
+                if tail:
+                    yield tail
+        finally:
+            self.response.close()
+
+    def _iter_bytes(self) -> Iterator[bytes]:
+        # requests and httpx responses name their streaming method differently
+        if hasattr(self.response, 'iter_content'):
+            return self.response.iter_content(chunk_size=self.chunk_size)
+        return self.response.iter_bytes(chunk_size=self.chunk_size)
+
+
+class HTTPClient:
+    """
+    Pooled HTTP client for page downloads, safe to share between threads
+    """
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10,
+                 retry_policy: Optional[RetryPolicy] = None, timeout: float = DEFAULT_TIMEOUT,
+                 http2: bool = False, headers: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            pool_connections: Number of hosts whose connection pools are kept
+            pool_maxsize: Keep-alive connections kept per host (the useful
+                maximum is the number of threads fetching from one host)
+            retry_policy: Retries and backoff for connection errors and
+                RETRYABLE_PAGE_STATUS_CODES responses; Retry-After is honoured
+            timeout: Seconds allowed to connect and between received bytes
+            http2: Use HTTP/2 where the server supports it (needs httpx[http2])
+            headers: Headers sent with every request, on top of DEFAULT_HEADERS
+        """
+        self.retry_policy = retry_policy or DEFAULT_PAGE_RETRY_POLICY
+        self.timeout = timeout
+        self.http2 = http2
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+
+        if http2:
+            if httpx is None:
+                raise ValueError("HTTP/2 needs httpx with its http2 extra: pip install 'httpx[http2]'")
+            # requests' pool_connections counts host pools, not connections; pool_maxsize is the connection cap
+            limits = httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize)
+            # The transport retries failed connection attempts; status retries happen in _send_httpx
+            self._client = httpx.Client(
+                http2=True,
+                headers=self.headers,
+                timeout=timeout,
+                follow_redirects=True,
+                transport=httpx.HTTPTransport(http2=True, limits=limits, retries=self.retry_policy.max_retries)
+            )
+        else:
+            retries = Retry(
+                total=self.retry_policy.max_retries,
+                backoff_factor=self.retry_policy.base_delay,
+                backoff_max=self.retry_policy.max_delay,
+                status_forcelist=RETRYABLE_PAGE_STATUS_CODES,
+                allowed_methods=frozenset({'GET', 'HEAD'}),
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retries)
+            self._client = requests.Session()
+            self._client.headers.update(self.headers)
+            self._client.mount('http://', adapter)
+            self._client.mount('https://', adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self._client.close()
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Any:
+        """
+        Start a streaming GET; the caller reads the body (e.g. with PageStream) and closes it
+
+        Returns:
+            A requests.Response, or an httpx.Response when HTTP/2 is enabled
+        """
+        if self.http2:
+            return self._send_httpx(url, headers)
+        return self._client.get(url, headers=headers, timeout=self.timeout, stream=True)
+
+    def _send_httpx(self, url: str, headers: Optional[Dict[str, str]]) -> Any:
+        request = self._client.build_request('GET', url, headers=headers)
+        attempt = 0
+        while True:
+            response = self._client.send(request, stream=True)
+            if response.status_code not in RETRYABLE_PAGE_STATUS_CODES or attempt >= self.retry_policy.max_retries:
+                return response
+            retry_after = parse_reset(response.headers.get('Retry-After'))
+            response.close()
+            delay = self.retry_policy.backoff(attempt)
+            time.sleep(min(self.retry_policy.max_delay, max(delay, retry_after or 0)))
+            attempt += 1
+
+
+_shared_client: Optional[HTTPClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_http_client() -> HTTPClient:
+    """Process-wide client with default settings, shared by every AccessibilityChecker"""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = HTTPClient()
+        return _shared_client
@@ -0,0 +1,435 @@
+"""
+LLM providers used by AIEvaluator
+
+A provider turns a (prefix, suffix) prompt into an LLMResponse. Rate limiting,
+retries, caching and usage accounting stay in AIEvaluator, so every provider
+gets them for free. Providers are looked up by name in a registry; register
+your own with register_provider():
+
+    register_provider("my-llm", MyProvider)
+    AIEvaluator(provider="my-llm", provider_options={"endpoint": ...})
+
+Besides OpenAI and Anthropic, a deterministic "local" provider answers without
+network access, with configurable latency, errors and token counts, for load
+tests and offline runs.
+"""
+
+import hashlib
+import json
+from abc import ABC, abstractmethod
+import os
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Mapping, Optional
+import openai
+from openai import OpenAI
+import anthropic
+from src.rate_limiter import RETRYABLE_STATUS_CODES
+
+SYSTEM_PROMPT = "You are an expert web accessibility auditor. Analyze the provided content and respond with valid JSON only."
+
+JSON_ONLY_INSTRUCTION = "\n\nPlease respond with valid JSON only, no additional text or explanation outside the JSON structure."
+
+
+class LLMResponse:
+    """
+    Text and token usage of one completion
+
+    input_tokens includes cached_input_tokens and cache_creation_input_tokens;
+    rate_limited_tokens is what the call counts against the provider's token limit.
+    """
+
+    def __init__(self, text: str, input_tokens: int = 0, output_tokens: int = 0, cached_input_tokens: int = 0,
+                 cache_creation_input_tokens: int = 0, rate_limited_tokens: Optional[int] = None,
+                 headers: Optional[Mapping[str, str]] = None):
+        self.text = text
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.cached_input_tokens = cached_input_tokens
+        self.cache_creation_input_tokens = cache_creation_input_tokens
+        self.rate_limited_tokens = input_tokens + output_tokens if rate_limited_tokens is None else rate_limited_tokens
+        # Read by the rate limiter (rate-limit headers of the HTTP response)
+        self.headers = headers or {}
+
+
+class LLMProvider(ABC):
+    """
+    Interface of an LLM backend
+
+    Subclasses set name, display_name and default_model and implement complete().
+    """
+
+    name = ""
+    display_name = ""
+    default_model = None
+
+    def __init__(self, model: Optional[str] = None):
+        self.model = model or self.default_model
+
+    @abstractmethod
+    def complete(self, prefix: str, suffix: str, max_tokens: int, temperature: float) -> LLMResponse:
+        """
+        Run one completion
+
+        Args:
+            prefix: Stable leading part of the prompt (page context), eligible for prompt caching
+            suffix: Per-request remainder of the prompt
+            max_tokens: Maximum response tokens
+            temperature: Sampling temperature
+
+        Returns:
+            LLMResponse; raise an exception with a status_code attribute for HTTP errors
+        """
+
+    def is_retryable(self, error: Exception) -> bool:
+        """Rate limits (429), overload (529) and server errors are transient"""
+        return getattr(error, 'status_code', None) in RETRYABLE_STATUS_CODES
+
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI chat completions"""
+
+    name = "openai"
+    display_name = "OpenAI"
+    # the newest OpenAI model is "gpt-4o" which was released May 13, 2024. do not change this unless explicitly requested by the user
+    default_model = "gpt-4o"
+
+    def __init__(self, model: Optional[str] = None, api_key: Optional[str] = None, base_url: Optional[str] = None):
+        super().__init__(model)
+        # Retries are handled by AIEvaluator so they respect the shared rate limiter
+        self.client = OpenAI(
+            api_key=api_key or os.getenv("OPENAI_API_KEY"),
+            base_url=base_url,
+            max_retries=0
+        )
+
+    def request_params(self, prefix: str, suffix: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        """Chat completion parameters, shared by live calls and batch files"""
+        # OpenAI caches prompt prefixes automatically; the system message and page
+        # context come first so every criteria of a page shares the same prefix
+        return {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": prefix + suffix
+                }
+            ],
+            "response_format": {"type": "json_object"},
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+
+    def complete(self, prefix: str, suffix: str, max_tokens: int, temperature: float) -> LLMResponse:
+        params = self.request_params(prefix, suffix, max_tokens, temperature)
+        raw_response = self.client.chat.completions.with_raw_response.create(**params)
+        response = self.parse_completion(raw_response.parse())
+        response.headers = raw_response.headers
+        return response
+
+    def parse_completion(self, completion: Any) -> LLMResponse:
+        """LLMResponse from a chat completion (SDK object or the JSON body of a batch result)"""
+        usage = _field(completion, 'usage')
+        choice = _field(completion, 'choices')[0]
+        text = _field(_field(choice, 'message'), 'content') or ""
+        if usage is None:
+            return LLMResponse(text)
+        return LLMResponse(
+            text,
+            input_tokens=_field(usage, 'prompt_tokens') or 0,
+            cached_input_tokens=_field(_field(usage, 'prompt_tokens_details'), 'cached_tokens') or 0,
+            output_tokens=_field(usage, 'completion_tokens') or 0
+        )
+
+    def is_retryable(self, error: Exception) -> bool:
+        return isinstance(error, openai.APIConnectionError) or super().is_retryable(error)
+
+
+class AnthropicProvider(LLMProvider):
+    """Anthropic messages"""
+
+    name = "anthropic"
+    display_name = "Anthropic"
+    # the newest Anthropic model is "claude-3-5-sonnet-20241022" which was released October 22, 2024
+    default_model = "claude-3-5-sonnet-20241022"
+
+    def __init__(self, model: Optional[str] = None, api_key: Optional[str] = None, base_url: Optional[str] = None):
+        super().__init__(model)
+        self.client = anthropic.Anthropic(
+            api_key=api_key or os.getenv("ANTHROPIC_API_KEY"),
+            base_url=base_url,
+            max_retries=0
+        )
+
+    def request_params(self, prefix: str, suffix: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        """Messages API parameters, shared by live calls and batch files"""
+        return {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": prefix,
+                            # Cache breakpoint after the page context shared by all criteria
+                            "cache_control": {"type": "ephemeral"}
+                        },
+                        {
+                            "type": "text",
+                            "text": suffix + JSON_ONLY_INSTRUCTION
+                        }
+                    ]
+                }
+            ]
+        }
+
+    def complete(self, prefix: str, suffix: str, max_tokens: int, temperature: float) -> LLMResponse:
+        params = self.request_params(prefix, suffix, max_tokens, temperature)
+        raw_response = self.client.messages.with_raw_response.create(**params)
+        response = self.parse_message(raw_response.parse())
+        response.headers = raw_response.headers
+        return response
+
+    def parse_message(self, message: Any) -> LLMResponse:
+        """LLMResponse from a message (live or from a batch result)"""
+        content = message.content[0]
+        text = content.text if hasattr(content, 'text') else str(content)
+        usage = message.usage
+        if usage is None:
+            return LLMResponse(text)
+        cache_read = getattr(usage, 'cache_read_input_tokens', 0) or 0
+        cache_creation = getattr(usage, 'cache_creation_input_tokens', 0) or 0
+        return LLMResponse(
+            text,
+            # Anthropic reports uncached, cache-read and cache-write input separately
+            input_tokens=(usage.input_tokens or 0) + cache_read + cache_creation,
+            cached_input_tokens=cache_read,
+            cache_creation_input_tokens=cache_creation,
+            output_tokens=usage.output_tokens or 0,
+            # Cache reads don't count towards Anthropic's input token limit
+            rate_limited_tokens=(usage.input_tokens or 0) + cache_creation + (usage.output_tokens or 0)
+        )
+
+    def is_retryable(self, error: Exception) -> bool:
+        return isinstance(error, anthropic.APIConnectionError) or super().is_retryable(error)
+
+
+class LocalProviderError(Exception):
+    """Simulated HTTP error of the local provider"""
+
+    def __init__(self, status_code: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(f"Error code: {status_code} - {message}")
+        self.status_code = status_code
+        # Same shape as SDK errors, so retry-after is honoured by the retry loop
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+# Prompts whose failed attempts LocalProvider remembers, and prompt prefixes it keeps
+# in its simulated prompt cache (oldest are forgotten first)
+MAX_TRACKED_PROMPTS = 10000
+
+# Shortest prefix the simulated prompt cache stores, as with OpenAI and Anthropic
+LOCAL_PROMPT_CACHE_MIN_TOKENS = 1024
+
+# Criteria ids listed in a batched prompt ("one key per criteria ID ("1.1.1", "1.4.3"))")
+BATCH_CRITERIA_PATTERN = re.compile(r'one key per criteria ID \(([^)]*)\)')
+
+
+def local_evaluation(prompt: str) -> Dict[str, Any]:
+    """Deterministic evaluation JSON for a prompt"""
+    digest = int(hashlib.sha256(prompt.encode('utf-8')).hexdigest(), 16)
+    status = ['pass', 'fail', 'warning'][digest % 3]
+    return {
+        'status': status,
+        'confidence': 0.5 + (digest % 50) / 100,
+        'assessment': f"Local provider assessment ({status})",
+        'issues': [] if status == 'pass' else ["Simulated issue"],
+        'recommendations': [] if status == 'pass' else ["Simulated recommendation"],
+        'priority': 'low' if status == 'pass' else 'medium'
+    }
+
+
+def local_response_text(prompt: str) -> str:
+    """Response text for single-criteria and batched prompts"""
+    match = BATCH_CRITERIA_PATTERN.search(prompt)
+    if match:
+        criteria_ids = re.findall(r'"([^"]+)"', match.group(1))
+        return json.dumps({criteria_id: local_evaluation(prompt + criteria_id) for criteria_id in criteria_ids})
+    return json.dumps(local_evaluation(prompt))
+
+
+class LocalProvider(LLMProvider):
+    """
+    Deterministic offline provider for load tests
+
+    Answers with valid evaluation JSON after a simulated latency, fails a
+    configurable share of calls with retryable HTTP errors and, when limits are
+    given, enforces per-minute request/token limits with OpenAI-style
+    rate-limit headers. Like the real providers, it reports a prefix it has
+    answered before as cached input tokens once the prefix is long enough.
+    Randomness is seeded per prompt and attempt, so a run is reproducible
+    regardless of thread scheduling.
+    """
+
+    name = "local"
+    display_name = "Local"
+    default_model = "local-evaluator"
+
+    def __init__(self, model: Optional[str] = None, latency_mean: float = 0.2, latency_std: float = 0.05,
+                 error_rate: float = 0.0, error_status_codes: tuple = (429, 500, 529),
+                 output_tokens_mean: float = 300, output_tokens_std: float = 80,
+                 requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None,
+                 seed: int = 0, sleep: Callable[[float], None] = time.sleep,
+                 prompt_cache_min_tokens: Optional[int] = LOCAL_PROMPT_CACHE_MIN_TOKENS):
+        """
+        Args:
+            model: Reported model name (part of evaluation cache keys)
+            latency_mean: Mean seconds per call (normal distribution, clipped at 0)
+            latency_std: Standard deviation of the latency
+            error_rate: Share of calls that fail with one of error_status_codes
+            error_status_codes: HTTP statuses used for simulated failures
+            output_tokens_mean: Mean output tokens (normal distribution, clipped to 1..max_tokens)
+            output_tokens_std: Standard deviation of the output tokens
+            requests_per_minute: Simulated provider request limit (None for unlimited)
+            tokens_per_minute: Simulated provider token limit (None for unlimited)
+            seed: Seed of all simulated randomness
+            sleep: Function used to wait (replace to simulate latency without waiting)
+            prompt_cache_min_tokens: Shortest prefix the simulated prompt cache
+                stores (None disables prompt caching)
+        """
+        super().__init__(model)
+        self.latency_mean = latency_mean
+        self.latency_std = latency_std
+        self.error_rate = error_rate
+        self.error_status_codes = error_status_codes
+        self.output_tokens_mean = output_tokens_mean
+        self.output_tokens_std = output_tokens_std
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.seed = seed
+        self.sleep = sleep
+        self._attempts: Dict[str, int] = {}
+        self._cached_prefixes: Dict[str, bool] = {}
+        self.prompt_cache_min_tokens = prompt_cache_min_tokens
+        self._window_start = time.monotonic()
+        self._window_requests = 0
+        self._window_tokens = 0
+        self._lock = threading.Lock()
+
+    def complete(self, prefix: str, suffix: str, max_tokens: int, temperature: float) -> LLMResponse:
+        prompt = prefix + suffix
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        with self._lock:
+            attempt = self._attempts.pop(prompt_hash, 0)
+            self._attempts[prompt_hash] = attempt + 1
+            if len(self._attempts) > MAX_TRACKED_PROMPTS:
+                del self._attempts[next(iter(self._attempts))]
+        rng = random.Random(f"{self.seed}:{prompt_hash}:{attempt}")
+
+        input_tokens = len(prompt) // 4 + 1
+        prefix_tokens = len(prefix) // 4
+        cacheable = self.prompt_cache_min_tokens is not None and prefix_tokens >= self.prompt_cache_min_tokens
+        prefix_hash = hashlib.sha256(prefix.encode('utf-8')).hexdigest() if cacheable else None
+        with self._lock:
+            cached_input_tokens = prefix_tokens if prefix_hash in self._cached_prefixes else 0
+        output_tokens = int(min(max_tokens, max(1, rng.gauss(self.output_tokens_mean, self.output_tokens_std))))
+        headers = self._take_capacity(input_tokens + output_tokens)
+
+        self.sleep(max(0.0, rng.gauss(self.latency_mean, self.latency_std)))
+        if rng.random() < self.error_rate:
+            status_code = rng.choice(self.error_status_codes)
+            raise LocalProviderError(status_code, "Simulated provider error",
+                                     {'retry-after': '1'} if status_code == 429 else None)
+        with self._lock:
+            # Attempts only matter for retries of a failed prompt
+            self._attempts.pop(prompt_hash, None)
+            # Like the real caches, a prefix is only readable once a call that wrote it has finished
+            if prefix_hash is not None:
+                self._cached_prefixes.pop(prefix_hash, None)
+                self._cached_prefixes[prefix_hash] = True
+                if len(self._cached_prefixes) > MAX_TRACKED_PROMPTS:
+                    del self._cached_prefixes[next(iter(self._cached_prefixes))]
+
+        return LLMResponse(
+            local_response_text(prompt),
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cached_input_tokens=cached_input_tokens,
+            headers=headers
+        )
+
+    def _take_capacity(self, tokens: int) -> Dict[str, str]:
+        """Apply the simulated per-minute limits; returns OpenAI-style rate-limit headers"""
+        if self.requests_per_minute is None and self.tokens_per_minute is None:
+            return {}
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= 60:
+                self._window_start = now
+                self._window_requests = 0
+                self._window_tokens = 0
+            reset = f"{max(0.0, 60 - (now - self._window_start)):.3f}s"
+            request_limit = self.requests_per_minute or 10 ** 9
+            token_limit = self.tokens_per_minute or 10 ** 12
+            if self._window_requests + 1 > request_limit or self._window_tokens + tokens > token_limit:
+                raise LocalProviderError(429, "Simulated rate limit exceeded", {'retry-after': reset.rstrip('s')})
+            self._window_requests += 1
+            self._window_tokens += tokens
+            return {
+                'x-ratelimit-limit-requests': str(request_limit),
+                'x-ratelimit-remaining-requests': str(request_limit - self._window_requests),
+                'x-ratelimit-reset-requests': reset,
+                'x-ratelimit-limit-tokens': str(token_limit),
+                'x-ratelimit-remaining-tokens': str(token_limit - self._window_tokens),
+                'x-ratelimit-reset-tokens': reset
+            }
+
+
+def _field(value: Any, name: str) -> Any:
+    """Attribute of an SDK object or key of the equivalent JSON dictionary"""
+    if value is None:
+        return None
+    if isinstance(value, dict):
+        return value.get(name)
+    return getattr(value, name, None)
+
+
+_providers: Dict[str, Callable[..., LLMProvider]] = {}
+
+
+def register_provider(name: str, factory: Callable[..., LLMProvider]):
+    """
+    Make a provider available to AIEvaluator(provider=name)
+
+    Args:
+        name: Provider name (case-insensitive)
+        factory: Called with the evaluator's provider_options; usually the provider class
+    """
+    _providers[name.lower()] = factory
+
+
+def create_provider(name: str, **options) -> LLMProvider:
+    """Instantiate a registered provider"""
+    factory = _providers.get(name.lower())
+    if factory is None:
+        raise ValueError(f"Unknown AI provider '{name}'. Available providers: {', '.join(sorted(_providers))}")
+    return factory(**options)
+
+
+def available_providers() -> list:
+    return sorted(_providers)
+
+
+register_provider(OpenAIProvider.name, OpenAIProvider)
+register_provider(AnthropicProvider.name, AnthropicProvider)
+register_provider(LocalProvider.name, LocalProvider)
@@ -0,0 +1,285 @@
+"""
+Local stand-in for the OpenAI HTTP API
+
+Serves chat completions, file upload/download and batches from memory, so
+the OpenAI provider, batch runs, retries and the rate limiter can be exercised
+without network access or API keys:
+
+    with StubLLMServer() as server:
+        AIEvaluator(provider_options={'base_url': server.base_url + '/v1', 'api_key': 'stub'})
+
+Answers come from a LocalProvider, so latency, error rate, token counts and
+rate limits are configurable and deterministic. Run it as a process with:
+
+    python -m src.llm_stub_server --port 8080 --latency 0.5 --error-rate 0.05
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple
+from src.llm_providers import LocalProvider
+
+# (HTTP status, JSON body, extra headers)
+ChatResult = Tuple[int, Dict[str, Any], Dict[str, str]]
+
+
+def provider_chat_handler(provider: LocalProvider) -> Callable[[Dict[str, Any]], ChatResult]:
+    """Answer OpenAI chat completion request bodies with a local provider"""
+    def handle(body: Dict[str, Any]) -> ChatResult:
+        prompt = "\n".join(
+            str(message.get('content', '')) for message in body.get('messages', []) if message.get('role') != 'system'
+        )
+        try:
+            response = provider.complete(prompt, "", body.get('max_tokens') or 2000, body.get('temperature', 1.0))
+        except Exception as e:
+            status_code = getattr(e, 'status_code', 500)
+            headers = dict(getattr(getattr(e, 'response', None), 'headers', None) or {})
+            return status_code, {'error': {'message': str(e), 'type': 'stub_error'}}, headers
+        return 200, {
+            'id': 'chatcmpl-' + hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:24],
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', provider.model),
+            'choices': [{
+                'index': 0,
+                'finish_reason': 'stop',
+                'message': {'role': 'assistant', 'content': response.text}
+            }],
+            'usage': {
+                'prompt_tokens': response.input_tokens,
+                'completion_tokens': response.output_tokens,
+                'prompt_tokens_details': {'cached_tokens': response.cached_input_tokens},
+                'total_tokens': response.input_tokens + response.output_tokens
+            }
+        }, dict(response.headers)
+    return handle
+
+
+class StubLLMServer:
+    """
+    Serves an OpenAI-compatible API from memory on a local port in a background thread
+    """
+
+    def __init__(self, provider: Optional[LocalProvider] = None,
+                 chat_handler: Optional[Callable[[Dict[str, Any]], ChatResult]] = None,
+                 batch_delay: float = 0.0, host: str = '127.0.0.1', port: int = 0):
+        """
+        Args:
+            provider: Local provider answering requests (instant, error-free responses by default)
+            chat_handler: Turns a chat completion request body into (HTTP status, response body,
+                headers); overrides provider
+            batch_delay: Seconds a batch stays 'in_progress' before it completes
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free one)
+        """
+        self.chat_handler = chat_handler or provider_chat_handler(provider or LocalProvider(latency_mean=0, latency_std=0))
+        self.batch_delay = batch_delay
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self):
+        self._thread.start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def serve_forever(self):
+        """Serve in the calling thread (for running the stub as a standalone process)"""
+        self._server.serve_forever()
+
+    def _new_id(self, prefix: str) -> str:
+        return f"{prefix}-{next(self._ids):06d}"
+
+    def _store_file(self, content: bytes, filename: str, purpose: str) -> Dict[str, Any]:
+        with self._lock:
+            file_id = self._new_id('file')
+            self.files[file_id] = {
+                'id': file_id,
+                'object': 'file',
+                'bytes': len(content),
+                'created_at': int(time.time()),
+                'filename': filename,
+                'purpose': purpose,
+                'status': 'processed',
+                'content': content
+            }
+        return self._public(self.files[file_id])
+
+    def _create_batch(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        input_file = self.files.get(body.get('input_file_id'))
+        if input_file is None:
+            return 404, {'error': {'message': f"No such file: {body.get('input_file_id')}"}}
+
+        # Requests are answered right away; the batch only reports completion after batch_delay
+        output_lines = []
+        error_lines = []
+        for line in input_file['content'].decode('utf-8').splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            status_code, response_body, _ = self.chat_handler(request.get('body', {}))
+            entry = {
+                'id': self._new_id('batch_req'),
+                'custom_id': request.get('custom_id'),
+                'response': {'status_code': status_code, 'body': response_body},
+                'error': None
+            }
+            (output_lines if status_code == 200 else error_lines).append(json.dumps(entry))
+
+        output_file = self._store_file(("\n".join(output_lines) + "\n").encode('utf-8'), 'output.jsonl', 'batch_output')
+        error_file = (self._store_file(("\n".join(error_lines) + "\n").encode('utf-8'), 'errors.jsonl', 'batch_output')
+                      if error_lines else None)
+        with self._lock:
+            batch_id = self._new_id('batch')
+            self.batches[batch_id] = {
+                'id': batch_id,
+                'object': 'batch',
+                'endpoint': body.get('endpoint'),
+                'input_file_id': input_file['id'],
+                'completion_window': body.get('completion_window', '24h'),
+                'created_at': int(time.time()),
+                'ready_at': time.monotonic() + self.batch_delay,
+                'output_file_id': output_file['id'],
+                'error_file_id': error_file['id'] if error_file else None,
+                'request_counts': {
+                    'total': len(output_lines) + len(error_lines),
+                    'completed': len(output_lines),
+                    'failed': len(error_lines)
+                }
+            }
+        return 200, self._batch_view(self.batches[batch_id])
+
+    def _batch_view(self, batch: Dict[str, Any]) -> Dict[str, Any]:
+        view = self._public(batch)
+        del view['ready_at']
+        if time.monotonic() < batch['ready_at']:
+            view.update(status='in_progress', output_file_id=None, error_file_id=None)
+        else:
+            view['status'] = 'completed'
+        return view
+
+    @staticmethod
+    def _public(record: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in record.items() if key != 'content'}
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                path = self.path.split('?')[0].rstrip('/')
+                parts = path.split('/')
+                if path.startswith('/v1/files/') and path.endswith('/content') and parts[3] in stub.files:
+                    self._send_bytes(200, stub.files[parts[3]]['content'], 'application/octet-stream')
+                elif path.startswith('/v1/files/') and len(parts) == 4 and parts[3] in stub.files:
+                    self._send_json(200, stub._public(stub.files[parts[3]]))
+                elif path.startswith('/v1/batches/') and len(parts) == 4 and parts[3] in stub.batches:
+                    self._send_json(200, stub._batch_view(stub.batches[parts[3]]))
+                else:
+                    self._send_json(404, {'error': {'message': f"Unknown endpoint GET {path}"}})
+
+            def do_POST(self):
+                path = self.path.split('?')[0].rstrip('/')
+                raw = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                if path == '/v1/files':
+                    fields = self._multipart_fields(raw)
+                    if 'file' not in fields:
+                        self._send_json(400, {'error': {'message': "Missing file"}})
+                        return
+                    content, filename = fields['file']
+                    purpose = fields.get('purpose', (b'', None))[0].decode('utf-8')
+                    self._send_json(200, stub._store_file(content, filename or 'upload.jsonl', purpose))
+                elif path == '/v1/batches':
+                    self._send_json(*stub._create_batch(json.loads(raw or b'{}')))
+                elif path == '/v1/chat/completions':
+                    status_code, body, headers = stub.chat_handler(json.loads(raw or b'{}'))
+                    self._send_json(status_code, body, headers)
+                else:
+                    self._send_json(404, {'error': {'message': f"Unknown endpoint POST {path}"}})
+
+            def _multipart_fields(self, raw: bytes) -> Dict[str, Tuple[bytes, Optional[str]]]:
+                header = f"Content-Type: {self.headers.get('Content-Type')}\r\n\r\n".encode('utf-8')
+                message = BytesParser(policy=HTTP).parsebytes(header + raw)
+                fields = {}
+                for part in message.iter_parts():
+                    name = part.get_param('name', header='content-disposition')
+                    fields[name] = (part.get_payload(decode=True) or b'', part.get_filename())
+                return fields
+
+            def _send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+                self._send_bytes(status, json.dumps(body).encode('utf-8'), 'application/json', headers)
+
+            def _send_bytes(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve an OpenAI-compatible stand-in API backed by the local provider")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.2, help="Mean seconds per completion")
+    parser.add_argument('--latency-std', type=float, default=0.05)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of completions failing with 429/500/529")
+    parser.add_argument('--output-tokens', type=float, default=300, help="Mean output tokens per completion")
+    parser.add_argument('--rpm', type=int, default=None, help="Simulated requests-per-minute limit")
+    parser.add_argument('--tpm', type=int, default=None, help="Simulated tokens-per-minute limit")
+    parser.add_argument('--batch-delay', type=float, default=0.0, help="Seconds before a batch completes")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    provider = LocalProvider(
+        latency_mean=args.latency,
+        latency_std=args.latency_std,
+        error_rate=args.error_rate,
+        output_tokens_mean=args.output_tokens,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        seed=args.seed
+    )
+    server = StubLLMServer(provider, batch_delay=args.batch_delay, host=args.host, port=args.port)
+    print(f"Serving OpenAI-compatible stand-in on {server.base_url}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
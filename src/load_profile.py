@@ -0,0 +1,153 @@
+"""
+Page-load profiles for axe scans
+
+A profile controls how long a scan waits for a page and which requests Chrome is
+allowed to make. Accessibility rules evaluate the DOM, so media, fonts and
+analytics beacons can usually be skipped without changing the results.
+"""
+
+from typing import List, Optional
+
+# File extensions of audio/video files and streams, and of web fonts
+MEDIA_EXTENSIONS = ['mp4', 'webm', 'ogv', 'mov', 'm4v', 'm3u8', 'mpd', 'mp3', 'wav', 'ogg', 'm4a', 'aac', 'flac']
+FONT_EXTENSIONS = ['woff', 'woff2', 'ttf', 'otf', 'eot']
+
+# DevTools resource types blocked instead, where requests can be intercepted (Fetch domain)
+MEDIA_RESOURCE_TYPE = 'Media'
+FONT_RESOURCE_TYPE = 'Font'
+
+
+def _path_patterns(extensions: List[str]) -> List[str]:
+    """
+    Network.setBlockedURLs patterns for URLs whose path ends in one of the extensions
+
+    The patterns match the whole URL, so they are anchored after a '/' and at
+    the end of the path: '*.mov*' would also block https://www.movistar.es/.
+    """
+    return [pattern for extension in extensions for pattern in (f'*/*.{extension}', f'*/*.{extension}?*')]
+
+
+# Chrome DevTools Network.setBlockedURLs patterns ('*' is a wildcard)
+MEDIA_URL_PATTERNS = _path_patterns(MEDIA_EXTENSIONS)
+
+FONT_URL_PATTERNS = _path_patterns(FONT_EXTENSIONS) + ['*://fonts.gstatic.com/*']
+
+ANALYTICS_URL_PATTERNS = [
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*facebook.net*', '*connect.facebook.com*', '*hotjar.com*', '*segment.io*',
+    '*segment.com/analytics*', '*mixpanel.com*', '*clarity.ms*', '*newrelic.com*',
+    '*nr-data.net*', '*quantserve.com*', '*scorecardresearch.com*', '*adservice.google.*'
+]
+
+# Registered on every new document when waiting for network idle: counts fetch/XHR
+# requests in flight and remembers when the last network activity happened
+NETWORK_TRACKER_SCRIPT = """
+(() => {
+    if (window.__a11yNetwork) return;
+    const state = window.__a11yNetwork = {inflight: 0, last: performance.now()};
+    const touch = () => { state.last = performance.now(); };
+    try {
+        new PerformanceObserver(() => touch()).observe({type: 'resource', buffered: true});
+    } catch (e) {}
+    if (window.fetch) {
+        const originalFetch = window.fetch;
+        window.fetch = function() {
+            state.inflight++;
+            touch();
+            return originalFetch.apply(this, arguments).finally(() => { state.inflight--; touch(); });
+        };
+    }
+    const originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        state.inflight++;
+        touch();
+        this.addEventListener('loadend', () => { state.inflight--; touch(); }, {once: true});
+        return originalSend.apply(this, arguments);
+    };
+})();
+"""
+
+NETWORK_IDLE_SCRIPT = """
+const idleMs = arguments[0];
+if (document.readyState === 'loading') return false;
+const state = window.__a11yNetwork;
+if (!state) return true;
+return state.inflight <= 0 && performance.now() - state.last >= idleMs;
+"""
+
+
+class LoadProfile:
+    """
+    How a page is loaded before axe runs
+    """
+
+    def __init__(self, page_load_strategy: str = 'normal', block_media: bool = False,
+                 block_fonts: bool = False, block_analytics: bool = False,
+                 blocked_url_patterns: Optional[List[str]] = None,
+                 network_idle_ms: Optional[int] = None, max_wait: float = 10.0):
+        """
+        Args:
+            page_load_strategy: WebDriver pageLoadStrategy ('normal', 'eager' or 'none')
+            block_media: Block audio and video downloads
+            block_fonts: Block web font downloads
+            block_analytics: Block well-known analytics and ad domains
+            blocked_url_patterns: Extra Network.setBlockedURLs patterns
+            network_idle_ms: Wait until the network has been quiet this long instead
+                of only waiting for <body> (None disables)
+            max_wait: Seconds to wait for the page before giving up
+        """
+        if page_load_strategy not in ('normal', 'eager', 'none'):
+            raise ValueError("page_load_strategy must be 'normal', 'eager' or 'none'")
+        self.page_load_strategy = page_load_strategy
+        self.block_media = block_media
+        self.block_fonts = block_fonts
+        self.block_analytics = block_analytics
+        self.blocked_url_patterns = list(blocked_url_patterns or [])
+        self.network_idle_ms = network_idle_ms
+        self.max_wait = max_wait
+
+    def blocked_urls(self, by_resource_type: bool = False) -> List[str]:
+        """
+        All URL patterns Chrome should refuse to load
+
+        Args:
+            by_resource_type: The caller blocks blocked_resource_types() itself
+                (Fetch interception), so media and font patterns are left out
+        """
+        patterns = []
+        if self.block_media and not by_resource_type:
+            patterns.extend(MEDIA_URL_PATTERNS)
+        if self.block_fonts and not by_resource_type:
+            patterns.extend(FONT_URL_PATTERNS)
+        if self.block_analytics:
+            patterns.extend(ANALYTICS_URL_PATTERNS)
+        patterns.extend(self.blocked_url_patterns)
+        return patterns
+
+    def blocked_resource_types(self) -> List[str]:
+        """DevTools resource types to fail when requests can be intercepted"""
+        resource_types = []
+        if self.block_media:
+            resource_types.append(MEDIA_RESOURCE_TYPE)
+        if self.block_fonts:
+            resource_types.append(FONT_RESOURCE_TYPE)
+        return resource_types
+
+    def ready_states(self) -> List[str]:
+        """document.readyState values that count as loaded for this profile"""
+        if self.page_load_strategy == 'normal':
+            return ['complete']
+        return ['interactive', 'complete']
+
+
+# Current behaviour: full load, nothing blocked
+DEFAULT_LOAD_PROFILE = LoadProfile()
+
+# Fast profile for DOM-only audits of heavy pages
+LEAN_LOAD_PROFILE = LoadProfile(
+    page_load_strategy='eager',
+    block_media=True,
+    block_fonts=True,
+    block_analytics=True,
+    network_idle_ms=500
+)
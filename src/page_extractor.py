@@ -0,0 +1,532 @@
+"""
+Single-pass extraction of the page_content dictionary for AI analysis
+
+Every element of the document is visited once and all collections (headings,
+landmarks, images, links, forms, media, meta tags, text) are filled during that
+one walk, instead of one find_all traversal per collection. Headings, like the
+other collections, come out in document order. Form control labels are
+resolved from indexes built during the walk (label for -> text, element id ->
+text), so labels and aria-labelledby targets may come before or after their
+control without a document search per control.
+
+The extractor consumes start/text/end events, so any parser can feed it.
+PARSER_BACKENDS holds the available ones: html.parser, lxml and html5lib
+(through BeautifulSoup or lxml's own event target) and selectolax's lexbor.
+They all produce the same page_content for the same well-formed document;
+text is whitespace-normalized so that parsers relocating insignificant
+whitespace don't change it.
+"""
+
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from bs4 import BeautifulSoup, Comment, Declaration, Doctype, ProcessingInstruction, Tag
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+try:
+    import html5lib
+except ImportError:
+    html5lib = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# iframes from these hosts are treated as embedded audio/video players
+MEDIA_EMBED_PATTERN = re.compile(
+    r'(youtube(-nocookie)?\.com|youtu\.be|vimeo\.com|dailymotion\.com|wistia\.(com|net)|soundcloud\.com|'
+    r'open\.spotify\.com|podcasts\.apple\.com|twitch\.tv|brightcove|jwplayer|ted\.com/talks)',
+    re.IGNORECASE
+)
+
+MEDIA_FILE_PATTERN = re.compile(r'\.(mp3|mp4|m4a|m4v|wav|ogg|oga|ogv|webm|aac|flac|mov|avi)([?#]|$)', re.IGNORECASE)
+
+# Elements with an implicit landmark role
+LANDMARK_ELEMENTS = {
+    'header': 'banner',
+    'nav': 'navigation',
+    'main': 'main',
+    'aside': 'complementary',
+    'footer': 'contentinfo',
+    'search': 'search'
+}
+
+LANDMARK_ROLES = {'banner', 'navigation', 'main', 'complementary', 'contentinfo', 'search', 'form', 'region'}
+
+HEADING_LEVELS = {f'h{level}': level for level in range(1, 7)}
+
+FORM_CONTROL_ELEMENTS = {'input', 'textarea', 'select'}
+
+# ARIA roles of custom widgets that take user input like native form controls
+FORM_CONTROL_ROLES = {'textbox', 'searchbox', 'combobox', 'checkbox', 'radio', 'switch', 'slider', 'listbox', 'spinbutton'}
+
+# Text inside these elements isn't page text (the same elements BeautifulSoup's get_text() skips)
+NON_TEXT_ELEMENTS = {'script', 'style', 'template', 'rt', 'rp'}
+
+# BeautifulSoup strings that aren't text content at all
+MARKUP_STRING_TYPES = (Comment, Declaration, Doctype, ProcessingInstruction)
+
+# Characters of page text and of HTML source kept for the prompt
+MAX_TEXT_CHARS = 5000
+MAX_HTML_CHARS = 10000
+
+# Characters of text kept per element id for aria-labelledby; wrappers like
+# #root or #app would otherwise each copy the text of the whole page
+MAX_ID_TEXT_CHARS = 256
+
+
+class PageContentExtractor:
+    """
+    Builds page_content from a stream of start-element, text and end-element events
+    """
+
+    def __init__(self, url: str, html: str = '', max_text_chars: int = MAX_TEXT_CHARS,
+                 max_html_chars: int = MAX_HTML_CHARS):
+        """
+        Args:
+            url: URL of the page
+            html: HTML source of the page (its beginning is kept as html_structure)
+            max_text_chars: Characters of page text to keep
+            max_html_chars: Characters of HTML source to keep
+        """
+        self.url = url
+        self.max_html_chars = max_html_chars
+        self.html_structure = html[:max_html_chars]
+        self.max_text_chars = max_text_chars
+        self.truncated = False
+        self.title: Optional[str] = None
+        self.lang: Optional[str] = None
+        self.headings: List[Dict[str, Any]] = []
+        self.landmarks: List[Dict[str, str]] = []
+        self.images: List[Dict[str, Any]] = []
+        self.links: List[Dict[str, Any]] = []
+        self.forms: List[Dict[str, Any]] = []
+        self.form_controls = 0
+        self.media = {'audio': 0, 'video': 0, 'embedded': 0, 'linked': 0}
+        self.meta_tags: Dict[str, str] = {}
+        self._text: List[str] = []
+        self._text_length = 0
+        self._seen_title = False
+        self._seen_html = False
+        self._non_text_depth = 0
+        # One entry per open element: (number of text collectors it opened, is a form, is a label,
+        # holds no page text, its id text entry)
+        self._open: List[Tuple[int, bool, bool, bool, Optional[list]]] = []
+        self._collectors: List[Tuple[List[str], Callable[[str], None]]] = []
+        self._open_forms: List[Dict[str, Any]] = []
+        self._open_labels: List[Dict[str, Any]] = []
+        # Label indexes: for attribute -> label text, element id -> text (for aria-labelledby)
+        self._label_for: Dict[str, str] = {}
+        self._id_text: Dict[str, str] = {}
+        # [id, text pieces, non-space characters] of open elements whose id text is still short of MAX_ID_TEXT_CHARS
+        self._filling_ids: List[list] = []
+        # Form controls whose label is resolved once the whole document is indexed
+        self._controls: List[Dict[str, Any]] = []
+
+    def add_source(self, chunk: str):
+        """Next piece of HTML source, for documents that arrive in chunks"""
+        if len(self.html_structure) < self.max_html_chars:
+            self.html_structure += chunk[:self.max_html_chars - len(self.html_structure)]
+
+    def start_element(self, name: str, attrs: Dict[str, Any]):
+        """An element opens; its text and children follow until the matching end_element"""
+        collectors = len(self._collectors)
+        is_form = False
+        is_label = False
+
+        if name in HEADING_LEVELS:
+            self._collect(lambda text: self.headings.append(
+                {'level': HEADING_LEVELS[name], 'text': text, 'tag': name}
+            ))
+        elif name == 'a':
+            href = attrs.get('href', '')
+            link = {'href': href, 'text': '', 'title': attrs.get('title', ''), 'has_text': False}
+            self.links.append(link)
+            self._collect(lambda text: link.update(text=text, has_text=bool(text)))
+            if MEDIA_FILE_PATTERN.search(href or ''):
+                self.media['linked'] += 1
+        elif name == 'img':
+            self.images.append({
+                'src': attrs.get('src', ''),
+                'alt': attrs.get('alt', ''),
+                'title': attrs.get('title', ''),
+                'has_alt': bool(attrs.get('alt'))
+            })
+        elif name in FORM_CONTROL_ELEMENTS:
+            self._form_control(attrs)
+        elif name == 'form':
+            form = {'action': attrs.get('action', ''), 'method': attrs.get('method', ''), 'inputs': []}
+            self.forms.append(form)
+            self._open_forms.append(form)
+            is_form = True
+        elif name == 'label':
+            self._open_label(attrs.get('for'))
+            is_label = True
+        elif name == 'meta':
+            meta_name = attrs.get('name') or attrs.get('property')
+            content = attrs.get('content')
+            if meta_name and content:
+                self.meta_tags[meta_name] = content
+        elif name == 'title' and not self._seen_title:
+            self._seen_title = True
+            self._collect(lambda text: setattr(self, 'title', text))
+        elif name == 'html' and not self._seen_html:
+            self._seen_html = True
+            self.lang = attrs.get('lang', '')
+        elif name in ('audio', 'video'):
+            self.media[name] += 1
+        elif name in ('object', 'embed'):
+            self.media['embedded'] += 1
+        elif name == 'iframe' and MEDIA_EMBED_PATTERN.search(attrs.get('src') or ''):
+            self.media['embedded'] += 1
+
+        if name not in FORM_CONTROL_ELEMENTS and _is_input_widget(attrs):
+            self.form_controls += 1
+
+        if name in LANDMARK_ELEMENTS or attrs.get('role') in LANDMARK_ROLES:
+            self.landmarks.append({
+                'role': attrs.get('role') or LANDMARK_ELEMENTS[name],
+                'label': attrs.get('aria-label', '')
+            })
+
+        element_id = attrs.get('id')
+        id_entry = None
+        if element_id and isinstance(element_id, str) and element_id not in self._id_text:
+            id_entry = [element_id, [], 0]
+            self._filling_ids.append(id_entry)
+
+        non_text = name in NON_TEXT_ELEMENTS
+        if non_text:
+            self._non_text_depth += 1
+
+        self._open.append((len(self._collectors) - collectors, is_form, is_label, non_text, id_entry))
+
+    def text(self, data: str):
+        """Text inside the currently open elements"""
+        if self._non_text_depth:
+            return
+        for pieces, _ in self._collectors:
+            pieces.append(data)
+        if self._filling_ids:
+            self._fill_id_text(data)
+        if self._text_length < self.max_text_chars:
+            # Counting only non-space characters keeps the cut-off independent of
+            # how a parser distributes whitespace
+            self._text.append(data)
+            self._text_length += sum(map(len, data.split()))
+
+    def end_element(self):
+        """The most recently opened element closes"""
+        collectors, is_form, is_label, non_text, id_entry = self._open.pop()
+        # Elements close in reverse order, so their collectors are always the innermost ones
+        for _ in range(collectors):
+            pieces, finish = self._collectors.pop()
+            finish(_normalize_space(''.join(pieces)))
+        if id_entry is not None:
+            if id_entry[2] < MAX_ID_TEXT_CHARS:
+                self._filling_ids = [entry for entry in self._filling_ids if entry is not id_entry]
+            self._id_text.setdefault(id_entry[0], _normalize_space(''.join(id_entry[1]))[:MAX_ID_TEXT_CHARS])
+        if is_form:
+            self._open_forms.pop()
+        if is_label:
+            self._open_labels.pop()
+        if non_text:
+            self._non_text_depth -= 1
+
+    def result(self) -> Dict[str, Any]:
+        """The page_content dictionary"""
+        for control in self._controls:
+            label = self._resolve_label(control)
+            if label is not None:
+                for input_data in control['inputs']:
+                    input_data['label'] = label
+                    input_data['has_label'] = True
+        return {
+            'url': self.url,
+            'title': self.title or '',
+            'lang': self.lang or '',
+            'headings': self.headings,
+            'landmarks': self.landmarks,
+            'images': self.images,
+            'links': self.links,
+            'forms': self.forms,
+            'form_controls': self.form_controls,
+            'media': self.media,
+            'text_content': _normalize_space(''.join(self._text))[:self.max_text_chars],
+            'html_structure': self.html_structure,
+            'meta_tags': self.meta_tags,
+            'truncated': self.truncated
+        }
+
+    def _fill_id_text(self, data: str):
+        """Add text to the open elements with an id, dropping those that have enough"""
+        length = sum(map(len, data.split()))
+        full = False
+        for entry in self._filling_ids:
+            entry[1].append(data)
+            entry[2] += length
+            full = full or entry[2] >= MAX_ID_TEXT_CHARS
+        if full:
+            self._filling_ids = [entry for entry in self._filling_ids if entry[2] < MAX_ID_TEXT_CHARS]
+
+    def _collect(self, finish: Callable[[str], None]):
+        """Start gathering the text of the element being opened; finish gets it when it closes"""
+        self._collectors.append(([], finish))
+
+    def _open_label(self, target: Optional[str]):
+        """
+        A label opens: with a for attribute it labels that id, otherwise the first
+        control it wraps
+        """
+        label = {'for': target, 'control': None}
+        self._open_labels.append(label)
+
+        def finish(text: str):
+            if target:
+                self._label_for.setdefault(target, text)
+            elif label['control'] is not None and label['control']['wrapping_label'] is None:
+                label['control']['wrapping_label'] = text
+
+        self._collect(finish)
+
+    def _form_control(self, attrs: Dict[str, Any]):
+        if (attrs.get('type') or '').lower() != 'hidden':
+            self.form_controls += 1
+        if not self._open_forms:
+            return
+        control = {
+            'inputs': [],
+            'id': attrs.get('id', ''),
+            'aria_labelledby': attrs.get('aria-labelledby', ''),
+            'aria_label': attrs.get('aria-label', ''),
+            'wrapping_label': None
+        }
+        for form in self._open_forms:
+            input_data = {
+                'type': attrs.get('type', ''),
+                'name': attrs.get('name', ''),
+                'id': attrs.get('id', ''),
+                'label': '',
+                'has_label': False
+            }
+            form['inputs'].append(input_data)
+            control['inputs'].append(input_data)
+        # Labels and aria-labelledby targets can come after the control, so the
+        # label is resolved once the walk is done
+        self._controls.append(control)
+        if self._open_labels and not self._open_labels[-1]['for'] and self._open_labels[-1]['control'] is None:
+            self._open_labels[-1]['control'] = control
+
+    def _resolve_label(self, control: Dict[str, Any]) -> Optional[str]:
+        """
+        Label of a form control, by precedence: aria-labelledby, aria-label,
+        a label pointing at its id, a label wrapping it (None when unlabelled)
+        """
+        if control['aria_labelledby']:
+            label = ' '.join(
+                self._id_text[element_id] for element_id in control['aria_labelledby'].split()
+                if self._id_text.get(element_id)
+            )
+            if label:
+                return label
+        if control['aria_label'].strip():
+            return control['aria_label'].strip()
+        if control['id'] and control['id'] in self._label_for:
+            return self._label_for[control['id']]
+        return control['wrapping_label']
+
+
+def _normalize_space(text: str) -> str:
+    return ' '.join(text.split())
+
+
+def _is_input_widget(attrs: Dict[str, Any]) -> bool:
+    """Whether a non-native element takes user input: an ARIA widget role or contenteditable"""
+    roles = (attrs.get('role') or '').lower().split()
+    # The first role is the one browsers use; the others are fallbacks
+    if roles and roles[0] in FORM_CONTROL_ROLES:
+        return True
+    editable = attrs.get('contenteditable')
+    return editable is not None and editable.strip().lower() in ('', 'true', 'plaintext-only')
+
+
+def walk_soup(soup: BeautifulSoup, extractor: PageContentExtractor):
+    """Feed every node of a BeautifulSoup tree to the extractor, in document order"""
+    stack = [iter(soup.contents)]
+    while stack:
+        node = next(stack[-1], None)
+        if node is None:
+            stack.pop()
+            if stack:
+                extractor.end_element()
+        elif isinstance(node, Tag):
+            extractor.start_element(node.name, node.attrs)
+            stack.append(iter(node.contents))
+        elif not isinstance(node, MARKUP_STRING_TYPES):
+            extractor.text(node)
+
+
+# Marks where an element's descendants end while walking a lexbor tree
+_END = object()
+
+
+def walk_lexbor(node, extractor: PageContentExtractor):
+    """Feed a lexbor node, its following siblings and all their descendants to the extractor"""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node is None:
+            continue
+        if node is _END:
+            extractor.end_element()
+            continue
+        stack.append(node.next)
+        if node.tag == '-text':
+            extractor.text(node.text_content)
+        elif node.is_element_node:
+            extractor.start_element(node.tag, {name: value or '' for name, value in node.attributes.items()})
+            stack.append(_END)
+            if node.tag == 'template':
+                # lexbor keeps template contents out of the tree, so they are parsed separately
+                markup = node.html
+                inner = markup[markup.index('>') + 1:markup.rindex('</template>')]
+                stack.append(LexborHTMLParser(inner, is_fragment=True, fragment_tag='template').root)
+            else:
+                stack.append(node.child)
+
+
+class _LxmlTarget:
+    """lxml parser target forwarding parse events to the extractor"""
+
+    def __init__(self, extractor: PageContentExtractor):
+        self.extractor = extractor
+
+    def start(self, tag: str, attrib: Dict[str, str]):
+        self.extractor.start_element(tag, attrib)
+
+    def end(self, tag: str):
+        self.extractor.end_element()
+
+    def data(self, data: str):
+        self.extractor.text(data)
+
+    def close(self):
+        return None
+
+
+def _parse_with_soup(builder: str) -> Callable[[str, PageContentExtractor], None]:
+    def parse(html: str, extractor: PageContentExtractor):
+        walk_soup(BeautifulSoup(html, builder), extractor)
+    return parse
+
+
+def _parse_with_lxml(html: str, extractor: PageContentExtractor):
+    if not html:
+        return
+    parser = etree.HTMLParser(target=_LxmlTarget(extractor))
+    parser.feed(html)
+    parser.close()
+
+
+def _feed_lxml(chunks: Iterable[str], extractor: PageContentExtractor):
+    parser = etree.HTMLParser(target=_LxmlTarget(extractor))
+    fed = False
+    for chunk in chunks:
+        extractor.add_source(chunk)
+        if chunk:
+            parser.feed(chunk)
+            fed = True
+    if fed:
+        parser.close()
+
+
+def _parse_with_lexbor(html: str, extractor: PageContentExtractor):
+    walk_lexbor(LexborHTMLParser(html).root, extractor)
+
+
+# Parser name -> function feeding a document to an extractor
+PARSER_BACKENDS: Dict[str, Callable[[str, PageContentExtractor], None]] = {
+    'html.parser': _parse_with_soup('html.parser')
+}
+if etree is not None:
+    PARSER_BACKENDS['lxml'] = _parse_with_lxml
+if html5lib is not None:
+    PARSER_BACKENDS['html5lib'] = _parse_with_soup('html5lib')
+if LexborHTMLParser is not None:
+    PARSER_BACKENDS['selectolax'] = _parse_with_lexbor
+
+# Parser name -> function feeding a document that arrives in chunks to an extractor,
+# for backends that can parse incrementally
+INCREMENTAL_PARSER_BACKENDS: Dict[str, Callable[[Iterable[str], PageContentExtractor], None]] = {}
+if etree is not None:
+    INCREMENTAL_PARSER_BACKENDS['lxml'] = _feed_lxml
+
+DEFAULT_PARSER = 'html.parser'
+
+# Backends that need the 'parsers' extra
+OPTIONAL_PARSERS = ('lxml', 'html5lib', 'selectolax')
+
+
+def available_parsers() -> List[str]:
+    """Names of the parser backends installed in this environment"""
+    return list(PARSER_BACKENDS)
+
+
+def check_parser(parser: str):
+    """
+    Raise ValueError unless the parser backend is installed
+
+    Args:
+        parser: Parser backend name
+    """
+    if parser in PARSER_BACKENDS:
+        return
+    available = ', '.join(available_parsers())
+    if parser in OPTIONAL_PARSERS:
+        raise ValueError(f"HTML parser '{parser}' is not installed. Install the 'parsers' extra "
+                         f"(pip install -e \".[parsers]\"). Available: {available}")
+    raise ValueError(f"Unknown HTML parser '{parser}'. Available: {available}")
+
+
+def extract_page_content(url: str, html: str, parser: str = DEFAULT_PARSER) -> Dict[str, Any]:
+    """
+    Build the AI analysis content dictionary from an HTML document
+
+    Args:
+        url: URL of the page
+        html: HTML source
+        parser: Parser backend, one of available_parsers()
+
+    Returns:
+        Dictionary containing page content and metadata
+    """
+    check_parser(parser)
+    extractor = PageContentExtractor(url, html)
+    PARSER_BACKENDS[parser](html, extractor)
+    return extractor.result()
+
+
+def extract_page_content_from_chunks(url: str, chunks: Iterable[str], parser: str = DEFAULT_PARSER) -> Dict[str, Any]:
+    """
+    Build the AI analysis content dictionary from HTML that arrives in chunks
+
+    Backends that parse incrementally (lxml) consume the chunks as they come, so
+    the whole document is never held in memory; the others parse the joined chunks.
+
+    Args:
+        url: URL of the page
+        chunks: Pieces of HTML source, in order
+        parser: Parser backend, one of available_parsers()
+
+    Returns:
+        Dictionary containing page content and metadata
+    """
+    if parser not in INCREMENTAL_PARSER_BACKENDS:
+        return extract_page_content(url, ''.join(chunks), parser)
+    extractor = PageContentExtractor(url)
+    INCREMENTAL_PARSER_BACKENDS[parser](chunks, extractor)
+    return extractor.result()
@@ -0,0 +1,275 @@
+"""
+Token-budgeted page context for AI evaluation prompts
+
+Instead of slicing every section of page_content at fixed sizes, the builder
+measures tokens and packs, per criteria, the sections that matter for it
+(all images for 1.1.1, every form control for 3.3.2, the landmark outline for
+1.3.1...) into a configurable budget. Sections irrelevant to the criteria are
+left out.
+
+The context is split in two parts: a small summary that is identical for
+every criteria of a page (the prompt prefix) and the criteria-specific
+sections (the prompt suffix). Providers only cache prefixes of 1024 tokens or
+more, so the summary is served from their prompt cache only when it is that
+long; AIEvaluator skips its cache warm-up call otherwise.
+
+Tokens are counted with tiktoken when it is installed, and otherwise with a
+local approximation of BPE tokenization that is close enough for budgeting.
+"""
+
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Word pieces, numbers and single punctuation characters, roughly as a BPE tokenizer splits them
+TOKEN_PIECE_PATTERN = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]|\s+")
+
+# Section -> title in the prompt
+SECTION_TITLES = {
+    'headings': "Headings Structure",
+    'landmarks': "Landmark Outline",
+    'images': "Images",
+    'links': "Links",
+    'forms': "Forms and Controls",
+    'media': "Audio and Video",
+    'meta_tags': "Meta Tags",
+    'text_content': "Text Content (excerpt)",
+    'html_structure': "HTML Structure (excerpt)"
+}
+
+# Criteria -> sections worth sending, most important first
+CRITERIA_SECTIONS = {
+    "1.1.1": ['images', 'html_structure'],
+    "1.2.1": ['media', 'text_content'],
+    "1.2.2": ['media', 'text_content'],
+    "1.3.1": ['landmarks', 'headings', 'forms', 'html_structure'],
+    "1.3.2": ['text_content', 'html_structure'],
+    "1.3.3": ['text_content', 'html_structure'],
+    "1.4.1": ['links', 'html_structure'],
+    "1.4.3": ['html_structure'],
+    "2.1.1": ['forms', 'links', 'html_structure'],
+    "2.1.2": ['forms', 'html_structure'],
+    "2.2.1": ['meta_tags', 'html_structure'],
+    "2.2.2": ['media', 'html_structure'],
+    "2.4.1": ['landmarks', 'links', 'headings'],
+    "2.4.2": ['headings', 'text_content'],
+    "2.4.3": ['links', 'forms', 'html_structure'],
+    "2.4.4": ['links'],
+    "2.4.6": ['headings', 'forms'],
+    "3.1.1": ['text_content'],
+    "3.1.2": ['text_content', 'html_structure'],
+    "3.2.1": ['forms', 'html_structure'],
+    "3.2.2": ['forms', 'html_structure'],
+    "3.3.1": ['forms', 'html_structure'],
+    "3.3.2": ['forms'],
+    "4.1.1": ['html_structure'],
+    "4.1.2": ['forms', 'links', 'html_structure']
+}
+
+# Used for criteria without an entry above
+DEFAULT_SECTIONS = ['headings', 'images', 'links', 'forms', 'text_content', 'html_structure']
+
+# Sections of the summary shared by every criteria of a page
+SHARED_SECTIONS = ['meta_tags', 'headings']
+
+# Sections made of one item per line, packed whole lines at a time; the others are truncated text
+LINE_SECTIONS = {'headings', 'landmarks', 'images', 'links', 'forms', 'media', 'meta_tags'}
+
+
+def _approximate_tokens(text: str) -> int:
+    count = 0
+    for piece in TOKEN_PIECE_PATTERN.findall(text):
+        if piece[0].isalpha():
+            # Common short words are one token; longer ones split into ~4-letter pieces
+            count += 1 if len(piece) <= 6 else (len(piece) + 3) // 4
+        elif not piece.isspace() or len(piece) > 1:
+            count += 1
+    return count
+
+
+if tiktoken is not None:
+    _encoding = tiktoken.get_encoding("o200k_base")
+
+    def count_tokens(text: str) -> int:
+        """Number of tokens in text"""
+        return len(_encoding.encode(text, disallowed_special=()))
+else:
+    def count_tokens(text: str) -> int:
+        """Number of tokens in text (approximation; install tiktoken for exact counts)"""
+        return _approximate_tokens(text)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, counter: Callable[[str], int] = count_tokens) -> str:
+    """Longest prefix of text that fits in max_tokens"""
+    if max_tokens <= 0:
+        return ''
+    tokens = counter(text)
+    while tokens > max_tokens and text:
+        # Shrink proportionally, with a little headroom so this converges in a few steps
+        text = text[:max(0, int(len(text) * max_tokens / tokens * 0.95))]
+        tokens = counter(text)
+    return text
+
+
+class PromptBuilder:
+    """
+    Packs page_content into a shared summary and per-criteria context within a token budget
+    """
+
+    def __init__(self, token_budget: int = 2500, shared_budget: int = 500,
+                 counter: Optional[Callable[[str], int]] = None):
+        """
+        Args:
+            token_budget: Maximum tokens of page context per call (shared summary included)
+            shared_budget: Tokens of the summary shared by all criteria of a page
+            counter: Token counting function (count_tokens by default)
+        """
+        if shared_budget > token_budget:
+            raise ValueError("shared_budget can't exceed token_budget")
+        self.token_budget = token_budget
+        self.shared_budget = shared_budget
+        self.count_tokens = counter or count_tokens
+        # (page_content, packed summary) of the last page: every prompt of a page asks for it twice
+        self._last_summary: Optional[Tuple[Dict[str, Any], Tuple[str, Set[str]]]] = None
+
+    def shared_context(self, page_content: Dict[str, Any]) -> str:
+        """Page summary that is identical for every criteria (the prompt prefix)"""
+        return self._pack_summary(page_content)[0]
+
+    def criteria_context(self, criteria_ids: List[str], page_content: Dict[str, Any]) -> str:
+        """
+        Sections relevant to the given criteria, packed into what's left of the budget
+
+        For several criteria (batched prompts) the union of their sections is used.
+        Sections the shared summary already contains in full are not repeated;
+        those it shortened are sent again here, with the criteria's own budget.
+        """
+        summary, complete_in_summary = self._pack_summary(page_content)
+        sections = []
+        for criteria_id in criteria_ids:
+            for section in CRITERIA_SECTIONS.get(criteria_id, DEFAULT_SECTIONS):
+                if section not in sections and section not in complete_in_summary:
+                    sections.append(section)
+        return self._pack_sections(sections, page_content, self.token_budget - self.count_tokens(summary))[0]
+
+    def _pack_summary(self, page_content: Dict[str, Any]) -> Tuple[str, Set[str]]:
+        """Page header and SHARED_SECTIONS within shared_budget; returns the text and the sections included in full"""
+        last_summary = self._last_summary
+        if last_summary is not None and last_summary[0] is page_content:
+            return last_summary[1]
+        header = f"""**Page Content Analysis:**
+
+**URL:** {page_content.get('url', 'Unknown')}
+**Page Title:** {page_content.get('title', 'No title')}
+**Language:** {page_content.get('lang') or 'Not specified'}
+"""
+        if page_content.get('truncated'):
+            header += "**Note:** The page exceeded the download size limit; only its beginning was analyzed.\n"
+        sections, complete = self._pack_sections(SHARED_SECTIONS, page_content, self.shared_budget - self.count_tokens(header))
+        packed = (header + sections, complete)
+        self._last_summary = (page_content, packed)
+        return packed
+
+    def _pack_sections(self, sections: List[str], page_content: Dict[str, Any], budget: int) -> Tuple[str, Set[str]]:
+        """
+        Render sections within budget tokens; returns the text and the sections included in full
+
+        Sections that fit in an equal share of the budget get all they need; the
+        rest of the budget is split among the others (water-filling), which are
+        cut at a line boundary or truncated.
+        """
+        rendered = []
+        for section in sections:
+            body = self._render_section(section, page_content)
+            if body:
+                title = f"\n**{SECTION_TITLES[section]}:**\n"
+                rendered.append((section, title, body, self.count_tokens(title + body)))
+        if not rendered:
+            return '', set()
+
+        allowances = {}
+        pending = list(rendered)
+        remaining = max(0, budget)
+        while pending:
+            share = remaining // len(pending)
+            fitting = [entry for entry in pending if entry[3] <= share]
+            if not fitting:
+                for entry in pending:
+                    allowances[entry[0]] = share
+                break
+            for entry in fitting:
+                allowances[entry[0]] = entry[3]
+                remaining -= entry[3]
+                pending.remove(entry)
+
+        output = ''
+        complete = set()
+        for section, title, body, tokens in rendered:
+            allowance = allowances[section]
+            if tokens <= allowance:
+                output += title + body
+                complete.add(section)
+                continue
+            body_budget = allowance - self.count_tokens(title)
+            if section in LINE_SECTIONS:
+                body = self._take_lines(body, body_budget)
+            else:
+                body = truncate_to_tokens(body, body_budget, self.count_tokens)
+            if body:
+                output += title + body
+        return output, complete
+
+    def _take_lines(self, body: str, budget: int) -> str:
+        """Whole lines that fit in budget, plus a note of how many were left out"""
+        lines = body.split('\n')
+        kept = []
+        used = 0
+        for line in lines:
+            # Keep room for the omission note
+            cost = self.count_tokens(line + '\n')
+            if used + cost > budget - 12:
+                break
+            kept.append(line)
+            used += cost
+        if not kept:
+            return ''
+        if len(kept) < len(lines):
+            kept.append(f"... ({len(lines) - len(kept)} more not shown)")
+        return '\n'.join(kept)
+
+    def _render_section(self, section: str, page_content: Dict[str, Any]) -> str:
+        """Compact text of one page_content section ('' when empty or missing)"""
+        if section == 'headings':
+            return '\n'.join(
+                f"{'  ' * (heading.get('level', 1) - 1)}h{heading.get('level')}: {heading.get('text', '')}"
+                for heading in page_content.get('headings', [])
+            )
+        if section == 'landmarks':
+            return '\n'.join(
+                landmark['role'] + (f" \"{landmark['label']}\"" if landmark.get('label') else '')
+                for landmark in page_content.get('landmarks', [])
+            )
+        if section in ('images', 'links'):
+            return '\n'.join(_compact_json(item) for item in page_content.get(section, []))
+        if section == 'forms':
+            lines = []
+            for form in page_content.get('forms', []):
+                lines.append(_compact_json({key: value for key, value in form.items() if key != 'inputs'}))
+                lines.extend('  ' + _compact_json(control) for control in form.get('inputs', []))
+            return '\n'.join(lines)
+        if section == 'media':
+            media = page_content.get('media') or {}
+            return _compact_json(media) if any(media.values()) else ''
+        if section == 'meta_tags':
+            return '\n'.join(f"{name}: {content}" for name, content in (page_content.get('meta_tags') or {}).items())
+        return (page_content.get(section) or '').strip()
+
+
+def _compact_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
@@ -0,0 +1,235 @@
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Mapping, Optional
+
+# Conservative starting limits; replaced by the provider's rate-limit headers after the first response
+DEFAULT_LIMITS = {
+    "openai": {"requests_per_minute": 500, "tokens_per_minute": 30000},
+    "anthropic": {"requests_per_minute": 50, "tokens_per_minute": 40000},
+    # The local provider only limits when configured to, and then reports its limits in headers
+    "local": {"requests_per_minute": 1000000, "tokens_per_minute": 1000000000}
+}
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits, server errors and Anthropic overload
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+# Header names per provider: (limit, remaining, reset) for requests and for tokens
+OPENAI_RATE_LIMIT_HEADERS = {
+    "requests": ("x-ratelimit-limit-requests", "x-ratelimit-remaining-requests", "x-ratelimit-reset-requests"),
+    "tokens": ("x-ratelimit-limit-tokens", "x-ratelimit-remaining-tokens", "x-ratelimit-reset-tokens")
+}
+
+RATE_LIMIT_HEADERS = {
+    "openai": OPENAI_RATE_LIMIT_HEADERS,
+    "local": OPENAI_RATE_LIMIT_HEADERS,
+    "anthropic": {
+        "requests": ("anthropic-ratelimit-requests-limit", "anthropic-ratelimit-requests-remaining",
+                     "anthropic-ratelimit-requests-reset"),
+        "tokens": ("anthropic-ratelimit-tokens-limit", "anthropic-ratelimit-tokens-remaining",
+                   "anthropic-ratelimit-tokens-reset")
+    }
+}
+
+DURATION_PATTERN = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds until a rate-limit window resets
+
+    Accepts OpenAI durations ('1s', '6m0s', '20ms'), Anthropic RFC 3339
+    timestamps and plain numbers of seconds (Retry-After).
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    matches = DURATION_PATTERN.findall(value)
+    if matches and ''.join(number + unit for number, unit in matches) == value:
+        scale = {'h': 3600.0, 'm': 60.0, 's': 1.0, 'ms': 0.001}
+        return sum(float(number) * scale[unit] for number, unit in matches)
+
+    try:
+        reset_at = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if reset_at.tzinfo is None:
+            reset_at = reset_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds())
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """
+    Continuously refilling bucket holding up to `capacity` units per minute
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.available = float(per_minute)
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float):
+        elapsed = now - self.updated_at
+        self.available = min(self.capacity, self.available + elapsed * self.capacity / 60.0)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (requests larger than capacity wait for a full bucket)"""
+        needed = min(amount, self.capacity) - self.available
+        if needed <= 0:
+            return 0.0
+        return needed * 60.0 / self.capacity
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter for requests per minute and tokens per minute
+
+    Callers reserve capacity with acquire() before each API call. Limits follow
+    the rate-limit headers the provider returns, and a 429/529 pauses every
+    caller sharing the limiter until the provider's reset time.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, provider: Optional[str] = None):
+        self.provider = provider
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, estimated_tokens: int):
+        """Block until one request with about `estimated_tokens` tokens may be sent"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.requests.refill(now)
+                self.tokens.refill(now)
+                wait = max(
+                    self._paused_until - now,
+                    self.requests.wait_time(1),
+                    self.tokens.wait_time(estimated_tokens)
+                )
+                if wait <= 0:
+                    self.requests.available -= 1
+                    self.tokens.available -= min(estimated_tokens, self.tokens.capacity)
+                    return
+            time.sleep(min(wait, 5.0))
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int):
+        """Give back (or take) the difference between the reservation and real usage"""
+        with self._lock:
+            self.tokens.available = min(self.tokens.capacity, self.tokens.available + estimated_tokens - actual_tokens)
+
+    def pause(self, seconds: float):
+        """Hold back every caller for `seconds` (e.g. after a 429 with Retry-After)"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers: Optional[Mapping[str, str]]):
+        """Adopt the limits and remaining capacity reported by the provider"""
+        names = RATE_LIMIT_HEADERS.get(self.provider)
+        if not headers or not names:
+            return
+        with self._lock:
+            now = time.monotonic()
+            for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+                limit_name, remaining_name, reset_name = names[kind]
+                limit = _header_number(headers, limit_name)
+                remaining = _header_number(headers, remaining_name)
+                bucket.refill(now)
+                if limit:
+                    bucket.capacity = limit
+                if remaining is not None:
+                    # The server's count is authoritative when it is tighter than ours
+                    bucket.available = min(bucket.available, remaining)
+                    if remaining <= 0:
+                        reset = parse_reset(headers.get(reset_name))
+                        if reset:
+                            self._paused_until = max(self._paused_until, now + reset)
+
+
+def _header_number(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff for transient API failures
+    """
+
+    def __init__(self, max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number `attempt` (0-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+def call_with_retries(request: Callable[[], Any], limiter: RateLimiter, estimated_tokens: int,
+                      policy: RetryPolicy, is_retryable: Callable[[Exception], bool]) -> Any:
+    """
+    Run an API request under the rate limiter, retrying transient failures
+
+    Args:
+        request: Performs the call and returns a raw response with `.headers`
+        limiter: Shared limiter to reserve capacity from
+        estimated_tokens: Tokens reserved per attempt
+        policy: Retry/backoff settings
+        is_retryable: Whether an exception is transient
+
+    Returns:
+        The raw response of the first successful attempt
+    """
+    attempt = 0
+    while True:
+        limiter.acquire(estimated_tokens)
+        try:
+            response = request()
+        except Exception as e:
+            # Nothing was consumed on the provider's side for a failed call
+            limiter.record_usage(estimated_tokens, 0)
+            if attempt >= policy.max_retries or not is_retryable(e):
+                raise
+            headers = getattr(getattr(e, 'response', None), 'headers', None)
+            limiter.update_from_headers(headers)
+            delay = policy.backoff(attempt)
+            retry_after = parse_reset(headers.get('retry-after')) if headers else None
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            if getattr(e, 'status_code', None) in (429, 529):
+                limiter.pause(delay)
+            print(f"Retrying AI request in {delay:.1f}s after error: {e}")
+            time.sleep(delay)
+            attempt += 1
+            continue
+
+        limiter.update_from_headers(getattr(response, 'headers', None))
+        return response
+
+
+_shared_limiters: Dict[str, RateLimiter] = {}
+_shared_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    """Process-wide limiter for a provider, shared by every AIEvaluator"""
+    with _shared_limiters_lock:
+        if provider not in _shared_limiters:
+            limits = DEFAULT_LIMITS.get(provider, {"requests_per_minute": 60, "tokens_per_minute": 60000})
+            _shared_limiters[provider] = RateLimiter(provider=provider, **limits)
+        return _shared_limiters[provider]
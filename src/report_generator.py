@@ -113,7 +113,7 @@ class ReportGenerator:
             return {'available': False}
         
         # Categorize by status and level
-        status_summary = {'pass': 0, 'fail': 0, 'warning': 0, 'error': 0}
+        status_summary = {'pass': 0, 'fail': 0, 'warning': 0, 'error': 0, 'not_applicable': 0}
         level_summary = {'A': {'pass': 0, 'fail': 0, 'warning': 0},
                         'AA': {'pass': 0, 'fail': 0, 'warning': 0},
                         'AAA': {'pass': 0, 'fail': 0, 'warning': 0}}
@@ -154,6 +154,10 @@ class ReportGenerator:
             level = result.get('level', 'A')
             status = result.get('status', 'fail')
             
+            # Criteria that don't apply to the page neither pass nor fail it
+            if status == 'not_applicable':
+                continue
+            
             if level in compliance:
                 compliance[level]['total'] += 1
                 if status == 'pass':
@@ -306,7 +310,7 @@ class ReportGenerator:
         # Calculate manual score
         manual_score = 0
         if manual_results:
-            total_manual = len(manual_results)
+            total_manual = sum(1 for r in manual_results.values() if r.get('status') != 'not_applicable')
             passed_manual = sum(1 for r in manual_results.values() if r.get('status') == 'pass')
             manual_score = (passed_manual / total_manual) * 100 if total_manual > 0 else 0
         